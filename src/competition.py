@@ -1,18 +1,40 @@
-def competition(items, score_function):
-    if len(items) == 0:
+import heapq
+
+import numpy as np
+
+
+def winner_index(scores):
+    "Index of the highest score, the first one if there is a tie"
+    if len(scores) == 0:
         raise Exception("Cannot have competition with no items")
-    else:
-        winner = items[0]
-        winning_score = score_function(winner)
-        for item in items[1:]:
-            score = score_function(item)
-            if score > winning_score:
-                winner = item
-                winning_score = score
-        return winner
+    return int(np.argmax(scores))
+
+
+def top_indices(scores, number_of_winners=1):
+    "Indices of the highest scores, highest first, with ties in their original order"
+    scores = np.asarray(scores)
+    if number_of_winners <= 0:
+        return np.array([], dtype=int)
+    if number_of_winners >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    # Partition off the winners without sorting everything, then sort just them
+    candidates = np.argpartition(-scores, number_of_winners - 1)[:number_of_winners]
+    threshold = scores[candidates].min()
+    candidates = np.flatnonzero(scores >= threshold)
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order][:number_of_winners]
+
+
+def competition(items, score_function):
+    "The item with the highest score, scoring each item once"
+    scores = [score_function(item) for item in items]
+    return items[winner_index(scores)]
 
 
 def multiwinner_competition(items, score_function, number_of_winners=1):
-    copy = items.copy()
-    copy.sort(key=score_function)
-    return copy[:number_of_winners]
+    "The items with the highest scores, highest first"
+    scores = [score_function(item) for item in items]
+    winners = heapq.nlargest(
+        number_of_winners, range(len(items)), key=scores.__getitem__
+    )
+    return [items[i] for i in winners]
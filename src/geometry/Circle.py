@@ -6,6 +6,55 @@ from src.geometry.Shape import Shape
 from src.geometry.Vector import Vector
 
 
+def steps_for_tolerance(radius: float, angleSize: float, tolerance: float) -> int:
+    """Fewest equal steps along an arc so no chord is further than tolerance from it.
+
+    A chord spanning an angle a is at most radius * (1 - cos(a / 2)) from the arc.
+    """
+    if tolerance <= 0:
+        raise ValueError("Tolerance must be positive, got {}".format(tolerance))
+    if tolerance >= radius:
+        return max(1, math.ceil(abs(angleSize) / math.pi))
+    step = 2 * math.acos(1 - tolerance / radius)
+    return max(1, math.ceil(abs(angleSize) / step))
+
+
+def arc_coordinates(
+    center: Vector,
+    radius: float,
+    startAngle=0.0,
+    angleSize=2.0 * math.pi,
+    tolerance=None,
+) -> np.ndarray:
+    """Points along an arc as an N×2 array.
+
+    Without a tolerance there are 100 steps and the end point is left off. With one
+    there are just enough equal steps to stay within it, and the end point is included.
+    """
+    if tolerance is None:
+        angles = np.arange(startAngle, startAngle + angleSize, angleSize / 100.0)
+    else:
+        steps = steps_for_tolerance(radius, angleSize, tolerance)
+        angles = startAngle + angleSize * np.arange(steps + 1) / steps
+    return np.stack(
+        [center.x + radius * np.cos(angles), center.y + radius * np.sin(angles)],
+        axis=1,
+    )
+
+
+def arc_after_segment(
+    segment: np.ndarray, radius: float, angleSize: float, tolerance=None
+) -> np.ndarray:
+    """Points along an arc carrying on from the end of a segment, given as its two
+    points, curving to the left for a positive angleSize"""
+    if len(segment) < 2:
+        raise Exception("Need a segment to continue an arc from!")
+    (x0, y0), (x1, y1) = segment[-2:].tolist()
+    normal = Vector(y0 - y1, x1 - x0).unitVector()
+    center = normal * radius + Vector(x1, y1)
+    return arc_coordinates(center, radius, normal.angle - math.pi, angleSize, tolerance)
+
+
 class Circle:
     def __init__(self, center: Vector, radius: float):
         self.center = center
@@ -22,27 +71,38 @@ class Circle:
         angle = w / self.circumference * 2 * math.pi
         return self.pointAtAngle(angle)
 
-    def iteratePoints(self, resolution, startAngle=0, endAngle=2 * math.pi):
-        for angle in np.arange(0, 2 * math.pi, 2 * math.pi / resolution):
-            yield self.pointAtAngle(angle)
-
-    def polyline(self, resolution):
-        shape = Shape(
+    def coordinates(self, resolution=None, tolerance=None) -> np.ndarray:
+        "Points evenly around the circle, without repeating the first"
+        if tolerance is not None:
+            resolution = max(
+                3, steps_for_tolerance(self.radius, 2 * math.pi, tolerance)
+            )
+        elif resolution is None:
+            raise ValueError("Need either a resolution or a tolerance")
+        angles = np.arange(0, 2 * math.pi, 2 * math.pi / resolution)
+        return np.stack(
             [
-                self.pointAtAngle(angle)
-                for angle in np.arange(0, 2 * math.pi, 2 * math.pi / resolution)
-            ]
+                self.center.x + self.radius * np.cos(angles),
+                self.center.y + self.radius * np.sin(angles),
+            ],
+            axis=1,
         )
+
+    def iteratePoints(self, resolution, startAngle=0, endAngle=2 * math.pi):
+        for x, y in self.coordinates(resolution).tolist():
+            yield Vector(x, y)
+
+    def polyline(self, resolution=None, tolerance=None):
+        shape = Shape(self.coordinates(resolution, tolerance))
         shape.close()
         return shape
 
 
-def arc(center: Vector, radius: float, startAngle=0.0, angleSize=2.0 * math.pi):
-    circle = Circle(center, radius)
-    step = angleSize / 100.0
-    shape = Shape()
-    for angle in np.arange(startAngle, startAngle + angleSize, step):
-        point = circle.pointAtAngle(angle)
-        shape.lineTo(point)
-
-    return shape
+def arc(
+    center: Vector,
+    radius: float,
+    startAngle=0.0,
+    angleSize=2.0 * math.pi,
+    tolerance=None,
+):
+    return Shape(arc_coordinates(center, radius, startAngle, angleSize, tolerance))
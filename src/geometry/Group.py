@@ -1,5 +1,6 @@
 import drawSvg as svg
 from src.geometry.Abstract_Group import Abstract_Group
+from src.geometry.Rectangle import Rectangle, minimumBoundingRect
 from src.geometry.Vector import Vector
 
 from src.geometry.isMovable import isMovable
@@ -18,21 +19,26 @@ class Group(Abstract_Group):
         for object in objects:
             self.append(object)
 
+    @property
+    def bounding_box(self) -> Rectangle:
+        "Combined bounding rectangle of all the objects in the group"
+        return minimumBoundingRect(list(self.iterate_objects()))
+
     @property
     def left(self) -> float:
-        return min([obj.left for obj in self.iterate_objects()])
+        return self.bounding_box.left
 
     @property
     def right(self) -> float:
-        return max([obj.right for obj in self.iterate_objects()])
+        return self.bounding_box.right
 
     @property
     def top(self) -> float:
-        return max([obj.top for obj in self.iterate_objects()])
+        return self.bounding_box.top
 
     @property
     def bottom(self) -> float:
-        return min([obj.bottom for obj in self.iterate_objects()])
+        return self.bounding_box.bottom
 
     @property
     def width(self):
@@ -174,32 +174,19 @@ class LineSegment:
             return False
 
     def closestPoint(self, X: Vector) -> Vector:
-        # TODO: there is so much that could be more efficient here!
-        if self.is_vertical():
-            x = self.start.x
-            if X.y < self.bottom:
-                return Vector(x, self.bottom)
-            elif X.y > self.top:
-                return Vector(x, self.top)
-            else:
-                return Vector(self.start.x, X.y)
-
-        normal = self.normal()
-        Y = self.extrapolatedIntersection(LineSegment(X, X + normal))
-        if not Y:
-            raise Exception("Something unexpected went wrong")
-
-
+        # Project X onto the line and clamp it to the segment
         P = self.start
         Q = self.end
-        x = (Y.x - P.x) / (Q.x - P.x)
+        dx = Q.x - P.x
+        dy = Q.y - P.y
+        x = ((X.x - P.x) * dx + (X.y - P.y) * dy) / (dx * dx + dy * dy)
 
         if x < 0:
             return P
         elif x > 1:
             return Q
         else:
-            return Y
+            return Vector(P.x + dx * x, P.y + dy * x)
 
     def is_vertical(self):
         return self.start.x == self.end.x
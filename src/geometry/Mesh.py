@@ -188,10 +188,11 @@ class Mesh:
         self.add_line(self.interupt_point(a), self.interupt_point(b))
 
     def add_seam(self, a: Shape, b: Shape, stitch_size: float = 10):
-        for w in np.arange(0, min(a.length, b.length), stitch_size):
+        ws = np.arange(0, min(a.length, b.length), stitch_size)
+        for p, q in zip(a.points_along(ws).tolist(), b.points_along(ws).tolist()):
             self.add_line(
-                self.interupt_point(a.point_along(w).tuple),
-                self.interupt_point(b.point_along(w).tuple),
+                self.interupt_point(tuple(p)),
+                self.interupt_point(tuple(q)),
             )
 
     def faces_np(self):
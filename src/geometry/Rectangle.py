@@ -23,11 +23,22 @@ class Rectangle:
         )
 
 
+def bounding_box(object) -> Rectangle:
+    "Get the bounding rectangle of any object, using a cached one if the object has it"
+    box = getattr(object, "bounding_box", None)
+    if box is not None:
+        return box
+    return Rectangle(
+        left=object.left, top=object.top, right=object.right, bottom=object.bottom
+    )
+
+
 def minimumBoundingRect(objects) -> Rectangle:
     "Find the minimum bounds rectangle of many objects"
+    boxes = [bounding_box(object) for object in objects]
     return Rectangle(
-        top=max([object.top for object in objects]),
-        bottom=min([object.bottom for object in objects]),
-        left=min([object.left for object in objects]),
-        right=max([object.right for object in objects]),
+        top=max([box.top for box in boxes]),
+        bottom=min([box.bottom for box in boxes]),
+        left=min([box.left for box in boxes]),
+        right=max([box.right for box in boxes]),
     )
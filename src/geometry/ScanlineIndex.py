@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.geometry.coordinates import ragged_offsets
+
+
+class ScanlineIndex:
+    "The y range of each segment of a poly line, for finding where it crosses levels"
+
+    def __init__(self, coordinates: np.ndarray):
+        self.starts = coordinates[:-1]
+        self.ends = coordinates[1:]
+        self.bottoms = np.minimum(self.starts[:, 1], self.ends[:, 1])
+        self.tops = np.maximum(self.starts[:, 1], self.ends[:, 1])
+
+    def extents_at(self, ys):
+        """Leftmost and rightmost x where the poly line meets each y level.
+
+        Both are NaN at levels the poly line doesn't reach. Horizontal segments count
+        with both of their ends.
+        """
+        ys = np.asarray(ys, dtype=np.float64).reshape(-1)
+        lefts = np.full(len(ys), np.inf)
+        rights = np.full(len(ys), -np.inf)
+
+        # Sweep the levels from the bottom, each segment is active for the run of
+        # levels within its y range
+        order = np.argsort(ys, kind="stable")
+        sorted_ys = ys[order]
+        first = np.searchsorted(sorted_ys, self.bottoms, side="left")
+        counts = np.searchsorted(sorted_ys, self.tops, side="right") - first
+        segments, offsets = ragged_offsets(counts)
+        levels = order[first[segments] + offsets]
+
+        a = self.starts[segments]
+        b = self.ends[segments]
+        dy = b[:, 1] - a[:, 1]
+        horizontal = dy == 0
+        x = a[:, 0] + np.divide(
+            (b[:, 0] - a[:, 0]) * (ys[levels] - a[:, 1]),
+            dy,
+            out=np.zeros(len(dy)),
+            where=~horizontal,
+        )
+        np.minimum.at(
+            lefts, levels, np.where(horizontal, np.minimum(a[:, 0], b[:, 0]), x)
+        )
+        np.maximum.at(
+            rights, levels, np.where(horizontal, np.maximum(a[:, 0], b[:, 0]), x)
+        )
+
+        missing = np.isinf(lefts)
+        lefts[missing] = np.nan
+        rights[missing] = np.nan
+        return lefts, rights
+
+    def widths_at(self, ys):
+        "Distance between the leftmost and rightmost points at each y level, or 0"
+        lefts, rights = self.extents_at(ys)
+        return np.nan_to_num(rights - lefts, nan=0.0)
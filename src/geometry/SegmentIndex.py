@@ -0,0 +1,73 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from src.geometry.coordinates import ragged_offsets
+from src.geometry.polyline_distance import project_onto_segments
+
+
+class SegmentIndex:
+    "Spatial index over the segments of a poly line, for fast closest point queries"
+
+    def __init__(self, coordinates: np.ndarray):
+        self.starts = coordinates[:-1]
+        self.ends = coordinates[1:]
+        vectors = self.ends - self.starts
+        lengths = np.sqrt(vectors[:, 0] * vectors[:, 0] + vectors[:, 1] * vectors[:, 1])
+        number_of_segments = len(lengths)
+        if number_of_segments == 0:
+            raise ValueError("Cannot index a shape with no segments")
+
+        # Sample every segment at least once per `spacing` and put the samples in a
+        # k-d tree. Any point on a segment is then within spacing / 2 of a sample.
+        # Long segments get extra samples, but never more than about 4 per segment
+        spacing = max(np.median(lengths), lengths.sum() / (4 * number_of_segments))
+        self.spacing = spacing if spacing > 0 else 1.0
+
+        counts = np.ceil(lengths / self.spacing).astype(int).clip(min=1) + 1
+        self.sample_segments, steps = ragged_offsets(counts)
+        progress = steps / (counts - 1)[self.sample_segments]
+        samples = (
+            self.starts[self.sample_segments]
+            + vectors[self.sample_segments] * progress[:, np.newaxis]
+        )
+        self.tree = cKDTree(samples)
+
+    def closest(self, points: np.ndarray):
+        "Closest segment index, coordinates and distance for each of an M×2 array of points"
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        number_of_points = len(points)
+
+        # An upper bound for the distance, from the segments of the nearest samples
+        k = min(4, self.tree.n)
+        _, nearest_samples = self.tree.query(points, k=k)
+        nearest_samples = nearest_samples.reshape(number_of_points, k)
+        candidates = self.sample_segments[nearest_samples]
+        _, distances = self.project(points[:, np.newaxis, :], candidates)
+        upper_bound = distances.min(axis=1)
+
+        # Every segment which could possibly be closer than the upper bound has a
+        # sample within spacing / 2 of it
+        found = self.tree.query_ball_point(
+            points, upper_bound + self.spacing / 2 + 1e-9
+        )
+        counts = np.array([len(samples) for samples in found])
+        query_indices = np.repeat(np.arange(number_of_points), counts)
+        segment_indices = self.sample_segments[
+            np.concatenate([np.asarray(samples, dtype=int) for samples in found])
+        ]
+        closest_points, distances = self.project(points[query_indices], segment_indices)
+
+        # Sort by query, then distance, then segment index and keep the first of each,
+        # so the first of two equally close segments wins
+        order = np.lexsort((segment_indices, distances, query_indices))
+        first = order[
+            np.searchsorted(query_indices[order], np.arange(number_of_points))
+        ]
+        return segment_indices[first], closest_points[first], distances[first]
+
+    def project(self, points: np.ndarray, segment_indices: np.ndarray):
+        "Closest point and distance from each point to the matching segment"
+        closest_points, _, distances = project_onto_segments(
+            points, self.starts[segment_indices], self.ends[segment_indices]
+        )
+        return closest_points, distances
@@ -5,20 +5,39 @@ import drawSvg as draw
 import numpy as np
 import collision
 
+from src.geometry import affine
+from src.geometry.coordinates import (
+    coordinate_array,
+    plain_numbers,
+    points_after,
+    remove_consecutive_duplicates,
+    vectors,
+)
 from src.geometry.Intersection import Intersection
 from src.geometry.LineSegment import LineSegment
+from src.geometry.offset import offset_polyline, segment_directions
+from src.geometry.point_in_polygon import points_in_polygon, polygon_edges
+from src.geometry.polyline_distance import closest_on_polyline
+from src.geometry.Rectangle import Rectangle
+from src.geometry.self_intersection import remove_loops, segment_crossings
+from src.geometry.simplify import simplify
 from src.geometry.vec3 import vec3
 from src.geometry.Vector import Vector, distance
-from src.competition import competition, multiwinner_competition
+from src.competition import top_indices, winner_index
+from src.constants import global_tolerance
 import tripy
 
 
 default_corner_threshold = math.radians(15)
 
+# Shapes with at least this many segments use a spatial index to find closest points,
+# building it only when at least this many points are looked up at once
+segment_index_threshold = 32
+segment_index_batch = 32
+
 
 class Shape:
     "As opposed to a monogamous line. This represents a shape made by many line segments joined end to end."
-    points: List[Vector]
     style: str
     label: str | None = None
 
@@ -26,46 +45,177 @@ class Shape:
     def __init__(self, points=[], label=None, style="line"):
         self.label = label
         self.style = style
-        self.points = [point.copy() for point in points]
+        self.coordinates = points
         self.fix_points()
 
+    # Point storage
+    @property
+    def coordinates(self) -> np.ndarray:
+        "The points of the shape as a read-only N×2 array of x, y coordinates"
+        self._apply_transform()
+        view = self._buffer[: self._size]
+        view.flags.writeable = False
+        return view
+
+    @coordinates.setter
+    def coordinates(self, points):
+        self._buffer = coordinate_array(points)
+        self._size = len(self._buffer)
+        self._owns_buffer = True
+        self._transform = None
+        self._invalidate()
+
+    def _apply_transform(self):
+        "Transform the points by any pending affine matrix"
+        if self._transform is not None:
+            self._buffer = affine.apply(self._transform, self._buffer[: self._size])
+            self._owns_buffer = True
+            self._transform = None
+
+    def _make_writable(self, capacity: int = 0):
+        """Make the buffer this shape's own, with room for `capacity` points.
+
+        Shapes share their buffer after copying, relabelling or transforming, so it is
+        copied before either of them changes it. When it is too small it is grown, at
+        least doubling it, so appending is cheap.
+        """
+        self._apply_transform()
+        if self._owns_buffer and capacity <= len(self._buffer):
+            return
+        capacity = max(capacity, self._size)
+        if capacity > self._size:
+            capacity = max(capacity, 2 * self._size)
+        buffer = np.empty((capacity, 2))
+        buffer[: self._size] = self._buffer[: self._size]
+        self._buffer = buffer
+        self._owns_buffer = True
+
+    def _share(self, label, style, reverse=False):
+        "A new shape sharing the points of this one until either of them changes"
+        shared = Shape.__new__(Shape)
+        shared.label = label
+        shared.style = style
+        shared._buffer = self._buffer[: self._size]
+        shared._size = self._size
+        shared._transform = self._transform
+        shared._owns_buffer = False
+        self._owns_buffer = False
+        if reverse:
+            shared._buffer = shared._buffer[::-1]
+            shared._cache = {}
+            if "bounding_box" in self._cache:
+                shared._cache["bounding_box"] = self._cache["bounding_box"]
+        else:
+            # The points are the same, so anything calculated from them is too
+            shared._cache = self._cache
+        return shared
+
+    def transform(self, matrix: np.ndarray):
+        """A new shape with the points transformed by a 3×3 affine matrix.
+
+        The points are shared with this shape and only transformed when they are
+        read, so a chain of transforms is composed into one matrix.
+        """
+        if not affine.is_invertible(matrix):
+            # Points could merge, so they need checking for duplicates straight away
+            return Shape(
+                affine.apply(matrix, self.coordinates),
+                label=self.label,
+                style=self.style,
+            )
+        transformed = self._share(self.label, self.style)
+        transformed._transform = (
+            matrix if self._transform is None else self._transform @ matrix
+        )
+        transformed._cache = {}
+        if "bounding_box" in self._cache and affine.is_axis_aligned(matrix):
+            left, top, right, bottom = self._cache["bounding_box"]
+            corners = affine.apply(matrix, np.array([[left, bottom], [right, top]]))
+            left, bottom, right, top = plain_numbers(
+                np.concatenate([corners.min(axis=0), corners.max(axis=0)])
+            )
+            transformed._cache["bounding_box"] = left, top, right, bottom
+        return transformed
+
+    def _invalidate(self):
+        "Forget everything calculated from the points, called whenever they change"
+        self._cache = {}
+
+    def _cached(self, key, calculate):
+        "Calculate a value from the points, or reuse it if the points haven't changed"
+        if key not in self._cache:
+            value = calculate()
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            self._cache[key] = value
+        return self._cache[key]
+
+    @property
+    def points(self) -> List[Vector]:
+        "The points of the shape as newly created Vector objects"
+        return vectors(self.coordinates)
+
+    @points.setter
+    def points(self, points):
+        self.coordinates = points
+
+    def point(self, index: int) -> Vector:
+        "The point at a given index as a new Vector"
+        x, y = plain_numbers(self.coordinates[index])
+        return Vector(x, y)
+
     def check_points(self):
-        for a, b, i in zip(self.points, self.points[1:], range(0, len(self.points))):
-            if a == b:
-                raise Exception("We have duplicate points at position {}".format(i))
+        duplicates = np.flatnonzero(
+            np.all(self.coordinates[1:] == self.coordinates[:-1], axis=1)
+        )
+        if len(duplicates) > 0:
+            raise Exception(
+                "We have duplicate points at position {}".format(duplicates[0])
+            )
 
     def fix_points(self):
-        points = []
-        for p in self.points:
-            if len(points) == 0 or p != points[len(points) - 1]:
-                points.append(p)
-        self.points = points
+        fixed = remove_consecutive_duplicates(self.coordinates)
+        if len(fixed) != self._size:
+            self.coordinates = fixed
 
     def copy(self):
-        return Shape(points=self.points, label=self.label, style=self.style)
+        return self._share(self.label, self.style)
 
     def firstPoint(self):
-        return self.points[0]
+        return self.point(0)
 
     @property
     def first_point(self):
-        return self.points[0]
+        return self.point(0)
 
     @property
     def last_point(self):
-        if len(self.points) == 0:
+        if self._size == 0:
             raise Exception("No points in the shape!")
-        return self.points[-1]
+        return self.point(-1)
 
     # deprecated
     def lastPoint(self):
         return self.last_point
 
+    def _extend(self, coordinates):
+        """Add rows of x, y coordinates to the end of the buffer as they are, leaving the
+        caller to invalidate anything calculated from the points"""
+        self._make_writable(self._size + len(coordinates))
+        self._buffer[self._size : self._size + len(coordinates)] = coordinates
+        self._size += len(coordinates)
+
     def append(self, p):
-        self.points.append(Vector(p.x, p.y))
+        self._extend([(p.x, p.y)])
+        self._invalidate()
+
+    def _line_to_many(self, coordinates: np.ndarray):
+        "Equivalent to calling line_to with each row of an N×2 array"
+        self._extend(points_after(self.coordinates, coordinates))
+        self._invalidate()
 
     def start_at(self, p):
-        self.points = [p.copy()]
+        self.coordinates = [p]
         return self
 
     def startAt(self, p):
@@ -73,7 +223,7 @@ class Shape:
         return self.start_at(p)
 
     def line_to(self, p):
-        if len(self.points) == 0 or self.lastPoint() != p:
+        if self._size == 0 or self.lastPoint() != p:
             self.append(p)
         return self
 
@@ -87,13 +237,12 @@ class Shape:
         distance_to_first = distance(self.last_point, other.first_point)
         distance_to_last = distance(self.last_point, other.last_point)
         points_to_add = (
-            other.points
+            other.coordinates
             if distance_to_last > distance_to_first
-            else reversed(other.points)
+            else other.coordinates[::-1]
         )
         # Then draw a line through all the points
-        for point in points_to_add:
-            self.line_to(point)
+        self._line_to_many(points_to_add)
         return self
 
     def line_through(self, *shapes):
@@ -125,15 +274,13 @@ class Shape:
         self.append(p)
         return self
 
-    def continue_with_arc(self, radius, angleSize):
-        normal = self.lastSegment().normal().unitVector()
-        center = normal * radius + self.end()
-        startAngle = normal.angle - math.pi
-        from src.geometry.Circle import arc
+    def continue_with_arc(self, radius, angleSize, tolerance=None):
+        "Continue along an arc turning off the last segment, see arc_coordinates"
+        from src.geometry.Circle import arc_after_segment
 
-        shape = arc(center, radius, startAngle, angleSize)
-        for point in shape.points:
-            self.lineTo(point)
+        self._line_to_many(
+            arc_after_segment(self.coordinates[-2:], radius, angleSize, tolerance)
+        )
         return self
 
     def close(self):
@@ -152,8 +299,12 @@ class Shape:
 
     def first_point_is_a_corner(self, threshhold=default_corner_threshold):
         if self.is_closed:
-            intersection = Intersection(self.points[-2], self.points[0], self.points[1])
-            return abs(intersection.angle) > threshhold
+            before = self.coordinates[-1] - self.coordinates[-2]
+            after = self.coordinates[1] - self.coordinates[0]
+            angle = math.atan2(
+                before[0] * after[1] - before[1] * after[0], before @ after
+            )
+            return abs(angle) > threshhold
         else:
             return False
 
@@ -170,32 +321,32 @@ class Shape:
         return copy
 
     def reverse(self):
-        return Shape(reversed(self.points), label=self.label, style=self.style)
+        return self._share(self.label, self.style, reverse=True)
 
     def close_by_mirroring_over_y_axis(self):
         copy = self.copy()
-        for point in reversed(self.points):
-            copy.lineTo(Vector(-point.x, point.y))
+        copy._line_to_many(self.coordinates[::-1] * (-1, 1))
         copy.close()
         return copy
 
     # Iteration
     def segments(self):
         "Iterate line segments"
-        for start, end in zip(self.points, self.points[1:]):
+        points = self.points
+        for start, end in zip(points, points[1:]):
             if start != end:
                 yield LineSegment(start, end)
 
     def segment(self, index):
-        return LineSegment(start=self.points[index], end=self.points[index + 1])
+        return LineSegment(start=self.point(index), end=self.point(index + 1))
 
     @property
     def numberOfSegments(self):
-        return len(self.points) - 1
+        return self._size - 1
 
     @property
     def number_of_points(self):
-        return len(self.points)
+        return self._size
 
     @property
     def has_no_points(self):
@@ -217,13 +368,31 @@ class Shape:
         "deprecated alias for last_segment property"
         return self.last_segment
 
+    def segment_lengths(self) -> np.ndarray:
+        "The length of every line segment, in order"
+
+        def calculate():
+            vectors = np.diff(self.coordinates, axis=0)
+            return np.sqrt(
+                vectors[:, 0] * vectors[:, 0] + vectors[:, 1] * vectors[:, 1]
+            )
+
+        return self._cached("segment_lengths", calculate)
+
+    def cumulative_lengths(self) -> np.ndarray:
+        "The distance along the poly line of every point, starting with 0 at the first point"
+
+        def calculate():
+            return np.concatenate([[0.0], np.cumsum(self.segment_lengths())])
+
+        return self._cached("cumulative_lengths", calculate)
+
     @property
     def length(self):
         "Measure the total length of the poly line"
-        sum = 0.0
-        for segment in self.segments():
-            sum += segment.length
-        return sum
+        if self._size == 0:
+            return 0.0
+        return float(self.cumulative_lengths()[-1])
 
     # TODO: Probably doesnt make sense for this to be a subclass any more
     # TODO: Define this class as a point a certain length along a line
@@ -290,15 +459,75 @@ class Shape:
         def width(self):
             return self.right - self.left
 
+    class MeasurementsAlongShape:
+        "Many measurements along a shape, stored together as arrays"
+
+        def __init__(self, parent, lengths_along, indices, remainders):
+            if np.any(remainders < 0):
+                raise ValueError("Remainders should be greater than 0")
+            self.parent = parent
+            self.lengths_along = lengths_along
+            self.indices = indices
+            self.remainders = remainders
+
+        def __len__(self):
+            return len(self.indices)
+
+        def __iter__(self):
+            for w, index, remainder in zip(
+                self.lengths_along.tolist(),
+                self.indices.tolist(),
+                self.remainders.tolist(),
+            ):
+                yield Shape.MeasurementAlongShape(self.parent, w, index, remainder)
+
+        @property
+        def points(self) -> np.ndarray:
+            "M×2 array with the coordinates of each measurement"
+            starts = self.parent.coordinates[self.indices]
+            ends = self.parent.coordinates[self.indices + 1]
+            progress = self.remainders / self.parent.segment_lengths()[self.indices]
+            progress = progress[:, np.newaxis]
+            return starts * (1.0 - progress) + ends * progress
+
+        @property
+        def normals(self) -> np.ndarray:
+            "M×2 array of unit vectors perpendicular to the parent at each measurement"
+            vectors = (
+                self.parent.coordinates[self.indices + 1]
+                - self.parent.coordinates[self.indices]
+            )
+            directions = vectors * (
+                1 / self.parent.segment_lengths()[self.indices, np.newaxis]
+            )
+            return np.stack([-directions[:, 1], directions[:, 0]], axis=1)
+
+    def measure_along_many(self, ws) -> MeasurementsAlongShape:
+        "Measure many distances along the poly line at once"
+        ws = np.asarray(ws, dtype=np.float64)
+        cumulative_lengths = self.cumulative_lengths()
+        indices = np.searchsorted(cumulative_lengths[1:], ws, side="left")
+        if np.any(indices >= self.numberOfSegments):
+            raise ValueError(
+                "shape.measure_along_many out of bounds. Expected 0 to {}, got {}".format(
+                    self.length, ws.max()
+                )
+            )
+        return self.MeasurementsAlongShape(
+            self, ws, indices, ws - cumulative_lengths[indices]
+        )
+
+    def points_along(self, ws) -> np.ndarray:
+        "Find the coordinates of many points at given distances along the poly line"
+        return self.measure_along_many(ws).points
+
     def measureAlong(self, w: float | int):
-        sum = 0
-        i = 0
-        for segment in self.segments():
-            if sum + segment.length < w:
-                sum += segment.length
-            else:
-                return self.MeasurementAlongShape(self, w, i, w - sum)
-            i += 1
+        cumulative_lengths = self.cumulative_lengths()
+        # Binary search for the first segment which ends at or beyond w
+        i = int(np.searchsorted(cumulative_lengths[1:], w, side="left"))
+        if i < self.numberOfSegments:
+            remainder = float(w - cumulative_lengths[i])
+            return self.MeasurementAlongShape(self, w, i, remainder)
         # otherwise
         raise ValueError(
             "shape.measureAlong out of bounds. Expected 0 to {}, got {}".format(
@@ -315,7 +544,7 @@ class Shape:
         return self.point_along(w)
 
     def evenlySpacedMeasurements(self, step=10):
-        return [self.measureAlong(w) for w in np.arange(0, self.length, step)]
+        return list(self.measure_along_many(np.arange(0, self.length, step)))
 
     def upsample(self):
         "Interpolate between the points to create a new poly line with greater resolution"
@@ -323,16 +552,41 @@ class Shape:
 
     def resample(self, interval):
         "Increase the resolution of the line, but no gaurantee for keeping the original points"
-        points = []
-        for l in np.arange(0, self.length, interval):
-            points.append(self.at(l).point)
-        if points[-1] != self.points[-1]:
-            points.append(self.points[-1].copy())
+        points = self.points_along(np.arange(0, self.length, interval))
+        if np.any(points[-1] != self.coordinates[-1]):
+            points = np.concatenate([points, self.coordinates[-1:]])
         return Shape(points)
 
-    def proximity(self, p):
+    def simplify(
+        self,
+        tolerance: float,
+        method="rdp",
+        keep=(),
+        corner_threshhold=default_corner_threshold,
+    ):
+        """Remove points which hardly change the shape.
+
+        "rdp" (Ramer–Douglas–Peucker) keeps every removed point within tolerance of the
+        result. "visvalingam" removes points making triangles with their neighbours
+        smaller than tolerance². The ends, corners sharper than the threshhold (None to
+        allow removing corners) and any points equal to one in `keep` are never removed.
+        """
+        keep_mask = np.zeros(self.number_of_points, dtype=bool)
+        if corner_threshhold is not None:
+            keep_mask[self.corner_indices(corner_threshhold)] = True
+        if len(keep) > 0:
+            kept = coordinate_array(keep)
+            keep_mask |= np.any(
+                np.all(self.coordinates[:, np.newaxis] == kept[np.newaxis], axis=2),
+                axis=1,
+            )
+        mask = simplify(self.coordinates, tolerance, keep_mask, method)
+        return Shape(self.coordinates[mask], label=self.label, style=self.style)
+
+    def proximity(self, p: Vector) -> float:
         "How close is point, p, from the poly line"
-        # TODO
+        _, _, distances = self._closest([p])
+        return float(distances[0])
 
     def tangent(self, w):
         "Get the tangent to the poly line at w millimeters along."
@@ -346,20 +600,34 @@ class Shape:
         normal = tangent.normal()
         return normal
 
+    @property
+    def bounding_box(self) -> Rectangle:
+        "The smallest rectangle containing all the points"
+
+        def calculate():
+            left, bottom, right, top = plain_numbers(
+                np.concatenate(
+                    [self.coordinates.min(axis=0), self.coordinates.max(axis=0)]
+                )
+            )
+            return left, top, right, bottom
+
+        return Rectangle(*self._cached("bounding_box", calculate))
+
     @property
     def top(self) -> float:
         "y coordinate of the topmost point"
-        return max([point.y for point in self.points])
+        return self.bounding_box.top
 
     @property
     def bottom(self) -> float:
         "y coordinate of the bottom-most point"
-        return min([point.y for point in self.points])
+        return self.bounding_box.bottom
 
     @property
     def left(self) -> float:
         "x coordinate of the left-most point"
-        return min([point.x for point in self.points])
+        return self.bounding_box.left
 
     def set_left(self, value: float):
         return self.translate(Vector(value - self.left, 0))
@@ -367,7 +635,7 @@ class Shape:
     @property
     def right(self) -> float:
         "x coordinate of the right-most point"
-        return max([point.x for point in self.points])
+        return self.bounding_box.right
 
     @property
     def bottom_left(self):
@@ -389,46 +657,38 @@ class Shape:
     def width(self) -> float:
         return self.right - self.left
 
+    def scanline_index(self):
+        "Index of the y range of each segment, built the first time it is needed"
+        from src.geometry.ScanlineIndex import ScanlineIndex
+
+        return self._cached("scanline_index", lambda: ScanlineIndex(self.coordinates))
+
     def leftmost_point_at_y_position(self, y):
-        winner = None
-        for segment in self.segments():
-            p = segment.leftmost_point_at_y_position(y)
-            if p and (winner == None or p.x < winner):
-                winner = p.x
-        if winner != None:
-            return Vector(winner, y)
-        else:
+        lefts, _ = self.scanline_index().extents_at([y])
+        if np.isnan(lefts[0]):
             return None
+        return Vector(float(lefts[0]), y)
 
     def rightmost_at_y_position(self, y):
-        winner = None
-        for segment in self.segments():
-            p = segment.rightmost_at_y_position(y)
-            if p and (winner == None or p.x > winner):
-                winner = p.x
-        if winner != None:
-            return Vector(winner, y)
-        else:
+        _, rights = self.scanline_index().extents_at([y])
+        if np.isnan(rights[0]):
             return None
+        return Vector(float(rights[0]), y)
 
     def width_at_y_position(self, y):
-        rightmost = self.rightmost_at_y_position(y)
-        leftmost = self.leftmost_point_at_y_position(y)
-        if rightmost and leftmost:
-            return rightmost.x - leftmost.x
-        else:
-            return 0.0
+        return float(self.widths_at([y])[0])
+
+    def widths_at(self, ys) -> np.ndarray:
+        "Width of the shape at each of many y positions, 0 where it doesn't reach"
+        return self.scanline_index().widths_at(ys)
 
     def subdivide_by_width(self, number_of_divisions=1, step=0):
         if step == 0:
             step = self.height / 100
 
-        shape = Shape()
-        for y in np.arange(self.bottom, self.top, step):
-            width = self.width_at_y_position(y)
-            x = width / number_of_divisions / 2
-            p = Vector(x, y)
-            shape.lineTo(p)
+        ys = np.arange(self.bottom, self.top, step)
+        xs = self.widths_at(ys) / number_of_divisions / 2
+        shape = Shape(np.stack([xs, ys], axis=1))
 
         shape = shape.close_by_mirroring_over_y_axis()
         return shape
@@ -438,27 +698,25 @@ class Shape:
         return self.top - self.bottom
 
     def start(self) -> Vector:
-        return self.points[0]
+        return self.point(0)
 
     def end(self) -> Vector:
-        return self.points[-1]
+        return self.point(-1)
 
     # Exporting
     def interleavedCoordinates(self):
-        for point in self.points:
-            yield point.x
-            yield point.y
+        yield from plain_numbers(self.coordinates)
 
     def labelText(self) -> str | None:
         return self.label
 
     def with_style(self, style: str):
         "Create a copy using a different style"
-        return Shape(points=self.points, label=self.label, style=style)
+        return self._share(self.label, style)
 
     def with_label(self, label: str):
         "Create a copy with a new label applied"
-        return Shape(points=self.points, label=label, style=self.style)
+        return self._share(label, self.style)
 
     def svg(self):
         "drawSvg object representation"
@@ -552,14 +810,27 @@ class Shape:
         return g
 
     def center_of_mass(self):
-        numberOfSamples = self.numberOfPoints * 2
-        interval = self.length / numberOfSamples
-        summed = Vector(0, 0)
-        n = 0.0
-        for w in np.arange(0, self.length, interval):
-            summed = summed + self.at(w).point
-            n += 1
-        return summed / n
+        "The centroid of the enclosed area for closed shapes, or of the line itself for open ones"
+
+        def calculate():
+            origin = self.coordinates[0]
+            points = self.coordinates - origin
+            starts, ends = points[:-1], points[1:]
+            if self.closed:
+                # Shoelace formula
+                cross = starts[:, 0] * ends[:, 1] - ends[:, 0] * starts[:, 1]
+                area = cross.sum() / 2
+                if abs(area) > global_tolerance:
+                    centroid = ((starts + ends) * cross[:, np.newaxis]).sum(axis=0)
+                    return tuple((centroid / (6 * area) + origin).tolist())
+            # Weight the midpoint of each segment by its length
+            lengths = self.segment_lengths()
+            if self.length == 0:
+                return tuple(self.coordinates[0].tolist())
+            centroid = ((starts + ends) / 2 * lengths[:, np.newaxis]).sum(axis=0)
+            return tuple((centroid / self.length + origin).tolist())
+
+        return Vector(*self._cached("center_of_mass", calculate))
 
     def midpoint(self):
         return self.center_of_mass()
@@ -660,9 +931,14 @@ class Shape:
     def svg_ruler(self, step=10):
         group = draw.Group()
         group.append(self.svg_line())
-        for w in np.arange(0, self.length, step):
-            m = self.at(w)
-            marker = m.normal().withLength(-3)
+        measurements = self.measure_along_many(np.arange(0, self.length, step))
+        for w, point, normal in zip(
+            measurements.lengths_along.tolist(),
+            measurements.points.tolist(),
+            measurements.normals.tolist(),
+        ):
+            start = Vector(*point)
+            marker = LineSegment(start, start + Vector(*normal)).withLength(-3)
             group.append(marker.svg())
             textPath = marker.withLength(100).translate(
                 marker.vector.withLength(marker.length + 1)
@@ -681,9 +957,14 @@ class Shape:
         color = "#999999"
         group = draw.Group()
         group.append(self.svg_line(stroke=color))
-        for w in np.arange(0, self.length, step):
-            m = self.at(w)
-            marker = m.normal().withLength(-3)
+        measurements = self.measure_along_many(np.arange(0, self.length, step))
+        for w, point, normal in zip(
+            measurements.lengths_along.tolist(),
+            measurements.points.tolist(),
+            measurements.normals.tolist(),
+        ):
+            start = Vector(*point)
+            marker = LineSegment(start, start + Vector(*normal)).withLength(-3)
             group.append(marker.svg(stroke=color))
             textPath = marker.withLength(100).translate(
                 marker.vector.withLength(marker.length + 1)
@@ -706,38 +987,24 @@ class Shape:
         return self.translate(Vector(amount, 0))
 
     def translate_in_place(self, translation_vector: Vector):
-        for point in self.points:
-            point.x += translation_vector.x
-            point.y += translation_vector.y
+        self._make_writable()
+        self._buffer[: self._size] += translation_vector.x, translation_vector.y
+        self._invalidate()
 
     def translate(self, t):
-        return Shape(
-            [point + t for point in self.points], label=self.label, style=self.style
-        )
+        return self.transform(affine.translation(t.x, t.y))
 
     def move(self, x, y):
         return self.translate(Vector(x, y))
 
     def scale(self, scalefactor):
-        return Shape(
-            [point * scalefactor for point in self.points],
-            label=self.label,
-            style=self.style,
-        )
+        return self.transform(affine.scaling(scalefactor, scalefactor))
 
     def scale_vertically(self, scalefactor):
-        return Shape(
-            [point.scale_vertically(scalefactor) for point in self.points],
-            label=self.label,
-            style=self.style,
-        )
+        return self.transform(affine.scaling(1.0, scalefactor))
 
     def scale_horizontally(self, scalefactor):
-        return Shape(
-            [point.scale_horizontally(scalefactor) for point in self.points],
-            label=self.label,
-            style=self.style,
-        )
+        return self.transform(affine.scaling(scalefactor, 1.0))
 
     def map_points(self, f):
         return Shape(
@@ -745,12 +1012,17 @@ class Shape:
         )
 
     def flipped_horizontally(self, mirror_x: float):
-        return self.map_points(lambda p: Vector(mirror_x - (p.x - mirror_x), p.y))
+        return self.transform(affine.horizontal_flip(mirror_x))
 
     def sliceAfter(self, start: int | float | Vector):
         startMeasurement = self.at(start)
         return Shape(
-            [startMeasurement.point, *self.points[startMeasurement.index + 1 :]]
+            np.concatenate(
+                [
+                    [startMeasurement.point.tuple],
+                    self.coordinates[startMeasurement.index + 1 :],
+                ]
+            )
         )
 
     def slice(
@@ -765,53 +1037,92 @@ class Shape:
             swap = startMeasurement
             startMeasurement = endMeasurement
             endMeasurement = swap
-        middlePoints = self.points[
+        middlePoints = self.coordinates[
             startMeasurement.index + 1 : endMeasurement.index + 1
         ]
-        return Shape([startMeasurement.point, *middlePoints, endMeasurement.point])
+        return Shape(
+            np.concatenate(
+                [
+                    [startMeasurement.point.tuple],
+                    middlePoints,
+                    [endMeasurement.point.tuple],
+                ]
+            )
+        )
 
     def slice_by_index(self, start_index: int, end_index: int):
-        new_shape = Shape()
-        for point in self.points[start_index:end_index]:
-            new_shape.line_to(point)
-        return new_shape
+        return Shape(self.coordinates[start_index:end_index])
 
     def allowance(self, allowance=25.4, label=None):
         if label == None:
             label = "{:.1f}mm allowance".format(math.fabs(allowance))
-        sliced_section = self.copy()
-        parallel = sliced_section.parallel(allowance)
-        result = Shape([], label=label, style="polygon")
-        for point in sliced_section.points:
-            result.lineTo(point)
-        for point in parallel.reverse().points:
-            result.lineTo(point)
+        parallel = offset_polyline(
+            self.coordinates, allowance, directions=self.segment_directions()
+        )
+        result = Shape(
+            np.concatenate([self.coordinates, parallel[::-1]]),
+            label=label,
+            style="polygon",
+        )
         result.close()
         return result
 
     def intersections(self):
-        for start, meeting, end in zip(self.points, self.points[1:], self.points[2:]):
+        points = self.points
+        for start, meeting, end in zip(points, points[1:], points[2:]):
             yield Intersection(start, meeting, end)
 
+    def turning_angles(self) -> np.ndarray:
+        "The angle turned at each point between the first and last, anticlockwise positive"
+
+        def calculate():
+            vectors = np.diff(self.coordinates, axis=0)
+            before, after = vectors[:-1], vectors[1:]
+            cross = before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0]
+            dot = (before * after).sum(axis=1)
+            return np.arctan2(cross, dot)
+
+        return self._cached("turning_angles", calculate)
+
     def angles(self):
         "Iterate all the three point angles"
-        return [intersection.angle for intersection in self.intersections()]
+        return self.turning_angles().tolist()
 
-    def corner_indices(self, threshhold_angle=default_corner_threshold):
-        for i in range(1, len(self.points) - 1):
-            intersection = Intersection(
-                self.points[i - 1], self.points[i], self.points[i + 1]
+    def _corner_table(self, threshhold_angle):
+        "Indices of the corners and of the points along each side, cached per threshhold"
+
+        def calculate():
+            corners = (
+                np.flatnonzero(np.abs(self.turning_angles()) > threshhold_angle) + 1
             )
-            if abs(intersection.angle) > threshhold_angle:
-                yield i
+            bounds = list(zip(corners, corners[1:]))
+            sides = [np.arange(i, j + 1) for i, j in bounds]
+            if self.closed:
+                last = self.number_of_points - 1
+                if self.first_point_is_a_corner(threshhold_angle):
+                    starts = [0, *corners]
+                    ends = [*corners, last]
+                    sides = [np.arange(i, j + 1) for i, j in zip(starts, ends)]
+                elif len(corners) > 0:
+                    # The side from the last corner wraps past the first point
+                    wrapped = np.concatenate(
+                        [np.arange(corners[-1], last + 1), np.arange(1, corners[0] + 1)]
+                    )
+                    sides.append(wrapped)
+                else:
+                    sides = [np.arange(last + 1)]
+            return corners, sides
+
+        return self._cached(("corner_table", threshhold_angle), calculate)
+
+    def corner_indices(self, threshhold_angle=default_corner_threshold):
+        corners, _ = self._corner_table(threshhold_angle)
+        return corners.tolist()
 
     def corners(self, threshholdAngle=math.radians(15)):
         "Find the corners that have an angle larger than the threshhold"
-        return [self.firstPoint()] + [
-            intersection.meeting
-            for intersection in self.intersections()
-            if abs(intersection.angle) > threshholdAngle
-        ]
+        corners, _ = self._corner_table(threshholdAngle)
+        return [self.firstPoint()] + vectors(self.coordinates[corners])
 
     def numbered_corners(self, threshholdAngle=math.radians(15)):
         corners = self.corners(threshholdAngle)
@@ -821,20 +1132,8 @@ class Shape:
         ]
 
     def sides(self, threshholdAngle=math.radians(15)):
-        corner_indices = list(self.corner_indices(threshholdAngle))
-        sides = [
-            self.slice_by_index(i, j + 1)
-            for i, j in zip(corner_indices, corner_indices[1:])
-        ]
-        if self.closed:
-            if self.first_point_is_a_corner(threshholdAngle):
-                sides.insert(0, self.slice_by_index(0, corner_indices[0] + 1))
-                sides.append(
-                    self.slice_by_index(corner_indices[-1], self.number_of_points)
-                )
-            else:
-                sides.append(self.slice_by_index(corner_indices[-1], corner_indices[1]))
-        return sides
+        _, sides = self._corner_table(threshholdAngle)
+        return [Shape(self.coordinates[indices]) for indices in sides]
 
     def numbered_sides(self, threshhold_angle=math.radians(15)):
         sides = self.sides(threshhold_angle)
@@ -843,23 +1142,105 @@ class Shape:
             for side, i in zip(sides, range(0, len(sides)))
         ]
 
+    def _segment_sides(self, threshhold_angle):
+        "The number of the side each segment is on, or -1 if it isn't on one"
+        _, sides = self._corner_table(threshhold_angle)
+        segments = np.full(self.numberOfSegments, -1, dtype=int)
+        for side, indices in enumerate(sides):
+            segments[indices[:-1] % len(segments)] = side
+        return segments
+
+    def side_indices(self, threshhold_angle=default_corner_threshold) -> np.ndarray:
+        "The number of the side, as in sides(), that each segment of a closed shape is on"
+        if not self.closed:
+            raise Exception("Can only number the sides of a closed shape")
+        return self._segment_sides(threshhold_angle)
+
+    def side(self, index: int, threshhold_angle=default_corner_threshold):
+        "One of the sides, without making all the others"
+        _, sides = self._corner_table(threshhold_angle)
+        return Shape(self.coordinates[sides[index]])
+
+    def side_centers(self, threshhold_angle=default_corner_threshold) -> np.ndarray:
+        "The center of mass of each side as an array of x, y coordinates"
+
+        def calculate():
+            _, sides = self._corner_table(threshhold_angle)
+            if self.closed and len(sides) == 1:
+                # The only side is the whole closed shape
+                return np.array([self.center_of_mass().tuple])
+            segment_sides = self._segment_sides(threshhold_angle)
+            on_a_side = segment_sides >= 0
+            lengths = self.segment_lengths()[on_a_side]
+            midpoints = (self.coordinates[:-1] + self.coordinates[1:])[on_a_side] / 2
+            side_lengths = np.bincount(
+                segment_sides[on_a_side], lengths, minlength=len(sides)
+            )
+            return np.stack(
+                [
+                    np.bincount(
+                        segment_sides[on_a_side],
+                        midpoints[:, axis] * lengths,
+                        minlength=len(sides),
+                    )
+                    / side_lengths
+                    for axis in (0, 1)
+                ],
+                axis=1,
+            )
+
+        return self._cached(("side_centers", threshhold_angle), calculate)
+
+    def signed_area(self) -> float:
+        "Area enclosed by the shape, positive if its points go anticlockwise"
+        starts, ends = self.polygon_edges()
+        return float((starts[:, 0] * ends[:, 1] - ends[:, 0] * starts[:, 1]).sum() / 2)
+
+    def with_allowances(
+        self,
+        allowances: dict,
+        threshhold_angle=default_corner_threshold,
+        join="miter",
+        miter_limit=None,
+        label=None,
+    ):
+        "The cutting line of a closed piece with an allowance in mm for each numbered side"
+        sides = self.side_indices(threshhold_angle)
+        widths = np.zeros(sides.max() + 1)
+        for side, allowance in allowances.items():
+            if not 0 <= side < len(widths):
+                raise ValueError(
+                    "No side {}, the shape has {} sides".format(side, len(widths))
+                )
+            widths[side] = allowance
+
+        # Positive offsets are to the left, which is outside a clockwise shape
+        outwards = -1 if self.signed_area() > 0 else 1
+        cutting_line = offset_polyline(
+            self.coordinates,
+            outwards * widths[sides],
+            join=join,
+            miter_limit=miter_limit,
+            closed=True,
+            directions=self.segment_directions(),
+        )
+        return Shape(cutting_line, label=label, style="polygon")
+
     def topmost_side(self):
-        sides = self.sides()
-        return competition(sides, lambda side: side.center_of_mass().y)
+        return self.side(winner_index(self.side_centers()[:, 1]))
 
     def bottommost_side(self):
-        return competition(self.sides(), lambda side: -side.center_of_mass().y)
+        return self.side(winner_index(-self.side_centers()[:, 1]))
 
     def rightmost_side(self):
-        return competition(self.sides(), lambda side: side.center_of_mass().x)
+        return self.side(winner_index(self.side_centers()[:, 0]))
 
     def leftmost_side(self):
-        return competition(self.sides(), lambda side: -side.center_of_mass().x)
+        return self.side(winner_index(-self.side_centers()[:, 0]))
 
     def topmost_sides(self, number_of_sides):
-        return multiwinner_competition(
-            self.sides(), lambda side: side.center_of_mass().y, number_of_sides
-        )
+        winners = top_indices(self.side_centers()[:, 1], number_of_sides)
+        return [self.side(i) for i in winners]
 
     def angleBisectionPathThing(self, distance):
         # First point is drawn at a normal to the first segment
@@ -876,40 +1257,86 @@ class Shape:
 
         return Shape([first, *inbetween, last])
 
-    def parallel(self, distance):
-        # First point is drawn at a normal to the first segment
-        first = self.firstSegment().parallel(distance).start
+    def segment_directions(self):
+        "Unit tangent and unit normal of each segment"
+        return self._cached(
+            "segment_directions", lambda: segment_directions(self.coordinates)
+        )
 
-        # Same for the last point
-        last = self.lastSegment().parallel(distance).end
+    def parallel(self, distance, join="miter", miter_limit=None, remove_loops=False):
+        """Offset the poly line by a distance, positive to the left of its direction.
+
+        Offsetting inwards round a tight curve makes the result cross itself, and
+        remove_loops cuts out the loops this leaves.
+        """
+        parallel = Shape(
+            offset_polyline(
+                self.coordinates,
+                distance,
+                join=join,
+                miter_limit=miter_limit,
+                directions=self.segment_directions(),
+            )
+        )
+        return parallel.without_loops() if remove_loops else parallel
 
-        inbetween = [
-            intersection.parallel(distance).meeting
-            for intersection in self.intersections()
-        ]
-        return Shape([first, *inbetween, last])
+    def self_intersections(self):
+        """Where the poly line crosses itself, as the indices of each pair of segments
+        and the points where they cross, see segment_crossings"""
+        return self._cached(
+            "self_intersections", lambda: segment_crossings(self.coordinates)
+        )
+
+    @property
+    def is_simple(self) -> bool:
+        "True if the poly line never crosses or touches itself"
+        return len(self.self_intersections()[0]) == 0
+
+    def without_loops(self):
+        "A copy with any loops where the poly line crosses itself cut out"
+        if self.is_simple:
+            return self.copy()
+        return Shape(remove_loops(self.coordinates), label=self.label, style=self.style)
+
+    def segment_index(self):
+        "Spatial index over the segments, built the first time it is needed"
+        from src.geometry.SegmentIndex import SegmentIndex
+
+        return self._cached("segment_index", lambda: SegmentIndex(self.coordinates))
+
+    def _closest(self, points):
+        "Closest segment index, coordinates and distance for each of many points"
+        points = coordinate_array(points)
+        if self.numberOfSegments >= segment_index_threshold and (
+            "segment_index" in self._cache or len(points) >= segment_index_batch
+        ):
+            return self.segment_index().closest(points)
+        else:
+            indices, closest_points, distances, _ = closest_on_polyline(
+                points, self.coordinates
+            )
+            return indices, closest_points, distances
+
+    def closest_many(self, points) -> MeasurementsAlongShape:
+        "Find the closest position along the poly line to each of many points"
+        indices, closest_points, _ = self._closest(points)
+        offsets = closest_points - self.coordinates[indices]
+        remainders = np.sqrt((offsets * offsets).sum(axis=1))
+        return self.MeasurementsAlongShape(
+            self, self.cumulative_lengths()[indices] + remainders, indices, remainders
+        )
+
+    def signed_distance_field(self, resolution: float = 1.0):
+        "Distances to the edge sampled every `resolution` millimeters, negative inside"
+        from src.geometry.SignedDistanceField import SignedDistanceField
+
+        return self._cached(
+            ("signed_distance_field", resolution),
+            lambda: SignedDistanceField(self, resolution),
+        )
 
     def closest(self, X: Vector) -> MeasurementAlongShape:
-        # TODO: This needs to be simplified a lot
-        Y = self.points[0]
-        winningDistance = distance(X, Y)
-        winningIndex = 0
-        remainder = 0
-        w = 0
-        sum = 0
-        i = 0
-        for segment in self.segments():
-            P = segment.closestPoint(X)
-            dist = distance(P, X)
-            if dist < winningDistance:
-                Y = P
-                winningDistance = dist
-                winningIndex = i
-                remainder = distance(segment.start, Y)
-                w = sum + remainder
-            i += 1
-            sum += segment.length
-        return self.MeasurementAlongShape(self, w, winningIndex, remainder)
+        return next(iter(self.closest_many([X])))
 
     def closestPoint(self, X) -> Vector:
         return self.closest(X).point
@@ -929,13 +1356,16 @@ class Shape:
         afterDart = self.slice(lengthAlong + width / 2)
         dartPoint = at.point + at.normal().unitVector() * depth
 
-        self.points = [*beforeDart.points, dartPoint, *afterDart.points]
+        self.coordinates = np.concatenate(
+            [beforeDart.coordinates, [dartPoint.tuple], afterDart.coordinates]
+        )
         return self
 
     def interpolationCurves(self, curveSpeed=1):
         from src.geometry.bezier import BezierCurve
 
-        q, r, s = self.points[:3]
+        points = self.points
+        q, r, s = points[:3]
         qrs = Intersection(q, r, s)
         qrDist = distance(q, r)
         guide1 = q + (r - q).withLength(qrDist / 2 * curveSpeed)
@@ -943,8 +1373,8 @@ class Shape:
         yield BezierCurve(q, guide1, guide2, r)
 
         # Interpolate middle segments
-        for i in range(3, len(self.points)):
-            p, q, r, s = self.points[i - 3 : i + 1]
+        for i in range(3, len(points)):
+            p, q, r, s = points[i - 3 : i + 1]
             pqr = Intersection(p, q, r)
             qrs = Intersection(q, r, s)
             qrDist = distance(q, r)
@@ -952,23 +1382,88 @@ class Shape:
             guide2 = r + qrs.bisect().normal().withLength(qrDist / 2 * curveSpeed)
             yield BezierCurve(q, guide1, guide2, r)
 
-        p, q, r = self.points[-3:]
+        p, q, r = points[-3:]
         pqr = Intersection(p, q, r)
         qrDist = distance(q, r)
         guide1 = q - pqr.bisect().normal().withLength(qrDist / 2 * curveSpeed)
         guide2 = r + (q - r).withLength(qrDist / 2 * curveSpeed)
         yield BezierCurve(q, guide1, guide2, r)
 
-    def interpolate(self, curveSpeed=1, upres=20):
-        points = []
-        for curve in self.interpolationCurves(curveSpeed):
-            points += curve.points(upres)[:-1]
-        return Shape(points)
+    def interpolation_controls(self, curveSpeed=1) -> np.ndarray:
+        """Control points of the curves from interpolationCurves as an M×4×2 array.
+
+        Each guide point is half the segment length from its end, along the segment at
+        the ends of the shape and square to the angle bisector at the other points.
+        """
+        points = self.coordinates
+        if len(points) < 3:
+            raise ValueError("Need at least 3 points to interpolate")
+        q, r = points[:-1], points[1:]
+        segment_lengths = np.sqrt(((r - q) ** 2).sum(axis=1))
+        directions = (r - q) / segment_lengths[:, np.newaxis]
+        lengths = segment_lengths / 2 * curveSpeed
+
+        # Normal to the bisector of the angle at each point between the ends
+        before = points[1:-1] - points[:-2]
+        after = points[2:] - points[1:-1]
+        first_angle = np.arctan2(before[:, 1], before[:, 0])
+        second_angle = np.arctan2(after[:, 1], after[:, 0]) + math.pi
+        second_angle = np.where(
+            second_angle > first_angle + 2 * math.pi,
+            second_angle - 2 * math.pi,
+            second_angle,
+        )
+        second_angle = np.where(
+            second_angle < first_angle, second_angle + 2 * math.pi, second_angle
+        )
+        bisector_angle = first_angle + (second_angle - first_angle) / 2
+        bisector = np.stack([np.cos(bisector_angle), np.sin(bisector_angle)], axis=1)
+        normals = np.stack([-bisector[:, 1], bisector[:, 0]], axis=1)
+
+        # Leaving each point, the first along its segment and the rest square to the
+        # bisector, then arriving at the next point
+        leaving = np.concatenate([directions[:1], -normals])
+        arriving = np.concatenate([normals, -directions[-1:]])
+        return np.stack(
+            [
+                q,
+                q + leaving * lengths[:, np.newaxis],
+                r + arriving * lengths[:, np.newaxis],
+                r,
+            ],
+            axis=1,
+        )
+
+    def interpolate(self, curveSpeed=1, upres=20, tolerance=None):
+        """Smooth the poly line with a Bezier curve through each segment.
+
+        Each curve gets `upres` points, or if a tolerance is given just enough points to
+        stay within it, which also keeps the last point.
+        """
+        if tolerance is not None:
+            from src.geometry.bezier import flatten_cubics
+
+            return Shape(
+                flatten_cubics(self.interpolation_controls(curveSpeed), tolerance)
+            )
+        from src.geometry.bezier import bernstein_matrix
+
+        # Every curve evaluated at the same values of t, leaving off their last points
+        weights = bernstein_matrix(np.linspace(0, 1, upres))[:-1]
+        return Shape((weights @ self.interpolation_controls(curveSpeed)).reshape(-1, 2))
 
     def replace(self, replacementSection):
         before = self.slice(0, replacementSection.start())
         after = self.slice(replacementSection.end())
-        return Shape(before.points + replacementSection.points + after.points)
+        return Shape(
+            np.concatenate(
+                [
+                    before.coordinates,
+                    replacementSection.coordinates,
+                    after.coordinates,
+                ]
+            )
+        )
 
     def to_3D(self):
         from src.geometry.Shape3d import Shape3d
@@ -986,17 +1481,20 @@ class Shape:
     def collision_polygon(self):
         return collision.Concave_Poly(collision.Vector(0, 0), self.collision_vectors())
 
+    def polygon_edges(self):
+        "Start and end coordinates of each edge, including the closing one"
+        return self._cached("polygon_edges", lambda: polygon_edges(self.coordinates))
+
+    def contains(self, points) -> np.ndarray:
+        "Boolean mask which is True for each point inside the shape, treated as closed"
+        starts, ends = self.polygon_edges()
+        return points_in_polygon(coordinate_array(points), starts, ends)
+
     def point_is_inside(self, point: Vector):
-        collision_polygon = self.collision_polygon()
-        collision_vector = point.collision_point()
-        return collision.collide(collision_polygon, collision_vector)
-        try:
-            collision.collide(collision_polygon, collision_vector)
-        except Exception as e:
-            print(e, collision_polygon, collision_vector)
+        return bool(self.contains([point])[0])
 
     def points_as_tuples(self):
-        return [(p.x, p.y) for p in self.points]
+        return [(x, y) for x, y in self.coordinates.tolist()]
 
     def triangles(self):
         if self.is_closed:
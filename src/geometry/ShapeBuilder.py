@@ -0,0 +1,119 @@
+import math
+
+from src.geometry.coordinates import coordinate_array, points_after
+from src.geometry.Shape import Shape
+from src.geometry.Vector import Vector, distance
+
+
+class ShapeBuilder:
+    """Draws a shape point by point, like the drawing methods of Shape but without
+    making Vectors or invalidating caches along the way. Call build() to get the
+    finished Shape."""
+
+    def __init__(self, start: Vector | None = None, capacity: int = 64):
+        # The points are drawn straight into the buffer of a shape nobody else sees, which
+        # never has a transform waiting, so its buffer can be read directly
+        self._shape = Shape()
+        self._shape._make_writable(max(capacity, 1))
+        self.style = "line"
+        if start is not None:
+            self.start_at(start)
+
+    @property
+    def coordinates(self):
+        "The points drawn so far as a read-only N×2 array"
+        return self._shape.coordinates
+
+    @property
+    def number_of_points(self) -> int:
+        return self._shape._size
+
+    @property
+    def last_point(self) -> Vector:
+        if self._shape._size == 0:
+            raise Exception("No points in the shape!")
+        return self._shape.point(-1)
+
+    @property
+    def last_angle(self) -> float:
+        "Angle of the last segment, or 0 if there isn't one yet"
+        if self._shape._size < 2:
+            return 0.0
+        (x0, y0), (x1, y1) = self.coordinates[-2:].tolist()
+        return math.atan2(y1 - y0, x1 - x0)
+
+    def start_at(self, p: Vector):
+        self._shape._size = 0
+        return self._add(p.x, p.y)
+
+    def _add(self, x: float, y: float):
+        "Add a point unless it is the same as the last one"
+        shape = self._shape
+        if shape._size > 0:
+            last_x, last_y = shape._buffer[shape._size - 1].tolist()
+            if last_x == x and last_y == y:
+                return self
+        shape._extend([(x, y)])
+        return self
+
+    def line_to(self, p: Vector):
+        return self._add(p.x, p.y)
+
+    def line(self, x: float, y: float):
+        "Draw a line relative to the last point"
+        shape = self._shape
+        if shape._size == 0:
+            raise Exception("No points in the shape!")
+        last_x, last_y = shape._buffer[shape._size - 1].tolist()
+        return self._add(last_x + x, last_y + y)
+
+    def line_down(self, amount):
+        return self.line(0, -amount)
+
+    def line_up(self, amount):
+        return self.line(0, amount)
+
+    def line_right(self, amount):
+        return self.line(amount, 0)
+
+    def line_left(self, amount):
+        return self.line(-amount, 0)
+
+    def line_to_many(self, points):
+        "Draw a line through many points, given as Vectors or an N×2 array"
+        self._shape._extend(points_after(self.coordinates, coordinate_array(points)))
+        return self
+
+    def line_through_shape(self, other: Shape):
+        "Draw a line through all the points of another shape, starting at its nearest end"
+        if self._shape._size == 0:
+            self.start_at(other.first_point)
+        last = self.last_point
+        if distance(last, other.last_point) > distance(last, other.first_point):
+            return self.line_to_many(other.coordinates)
+        return self.line_to_many(other.coordinates[::-1])
+
+    def line_through(self, *shapes: Shape):
+        for shape in shapes:
+            self.line_through_shape(shape)
+        return self
+
+    def continue_with_arc(self, radius, angleSize, tolerance=None):
+        "Continue along an arc turning off the last segment, see arc_coordinates"
+        from src.geometry.Circle import arc_after_segment
+
+        return self.line_to_many(
+            arc_after_segment(self.coordinates, radius, angleSize, tolerance)
+        )
+
+    def close(self):
+        if self._shape._size > 0:
+            self._add(*self.coordinates[0].tolist())
+        self.style = "polygon"
+        return self
+
+    def build(self, label=None, style=None) -> Shape:
+        """The finished shape, sharing the points drawn so far until either it or the
+        builder changes them"""
+        self._shape._invalidate()
+        return self._shape._share(label, self.style if style is None else style)
@@ -0,0 +1,116 @@
+import math
+
+import numpy as np
+from scipy import ndimage
+
+from src.geometry.coordinates import ragged_offsets
+from src.geometry.polyline_distance import project_onto_segments
+
+# Grid points within this many steps of the edge get the exact distance
+exact_band = 2
+
+
+def walk_to_closest_segment(points, starts, ends, segments) -> np.ndarray:
+    """Distance from each point to the edge of a closed shape, starting from a segment
+    near the closest one and moving to the segment either side while it is closer"""
+    segments = segments.copy()
+    _, _, distances = project_onto_segments(points, starts[segments], ends[segments])
+    moving = np.arange(len(points))
+    while len(moving) > 0:
+        best = segments[moving]
+        best_distances = distances[moving]
+        for step in (-1, 1):
+            neighbours = (segments[moving] + step) % len(starts)
+            _, _, neighbour_distances = project_onto_segments(
+                points[moving], starts[neighbours], ends[neighbours]
+            )
+            closer = neighbour_distances < best_distances
+            best = np.where(closer, neighbours, best)
+            best_distances = np.where(closer, neighbour_distances, best_distances)
+        moved = best != segments[moving]
+        segments[moving] = best
+        distances[moving] = best_distances
+        moving = moving[moved]
+    return distances
+
+
+class SignedDistanceField:
+    """Distances to the edge of a closed shape sampled on a regular grid, negative inside.
+
+    Grid points near the edge get the exact distance. Further away, a distance
+    transform of the grid finds the nearest point sampled along the edge, and the
+    distance is measured from the segment that point is on, moving along the edge while
+    the segments get closer. Where the edge curves round a point this can stop short of
+    the closest segment, giving a distance up to about a grid step too large.
+    """
+
+    def __init__(self, shape, resolution: float = 1.0, margin: float | None = None):
+        if not shape.is_closed:
+            raise ValueError("Can only make a signed distance field for a closed shape")
+        if margin is None:
+            margin = 2 * resolution
+        box = shape.bounding_box
+        self.resolution = resolution
+        self.left = box.left - margin
+        self.bottom = box.bottom - margin
+        columns = math.ceil((box.width + 2 * margin) / resolution) + 1
+        rows = math.ceil((box.height + 2 * margin) / resolution) + 1
+        xs = self.left + resolution * np.arange(columns)
+        ys = self.bottom + resolution * np.arange(rows)
+
+        grid = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+
+        # Mark the grid point nearest each of many points along the edge, no more than
+        # half a grid step apart, with the segment the point is on
+        coordinates = shape.coordinates
+        starts, ends = coordinates[:-1], coordinates[1:]
+        counts = np.ceil(shape.segment_lengths() / (resolution / 2)).astype(int) + 1
+        segments, steps = ragged_offsets(counts)
+        progress = (steps / counts[segments])[:, np.newaxis]
+        samples = starts[segments] + (ends - starts)[segments] * progress
+        sample_columns = np.rint((samples[:, 0] - self.left) / resolution).astype(int)
+        sample_rows = np.rint((samples[:, 1] - self.bottom) / resolution).astype(int)
+        nearest_segment = np.full((rows, columns), -1)
+        nearest_segment[
+            np.clip(sample_rows, 0, rows - 1), np.clip(sample_columns, 0, columns - 1)
+        ] = segments
+
+        steps_to_edge, (edge_rows, edge_columns) = ndimage.distance_transform_edt(
+            nearest_segment < 0, return_indices=True
+        )
+        nearest = nearest_segment[edge_rows, edge_columns].reshape(-1)
+        distances = walk_to_closest_segment(grid, starts, ends, nearest)
+
+        near = steps_to_edge.reshape(-1) <= exact_band
+        distances[near] = shape._closest(grid[near])[2]
+
+        distances = distances.reshape(rows, columns)
+        inside = shape.contains(grid).reshape(rows, columns)
+        self.values = np.where(inside, -distances, distances)
+
+    def distance(self, points) -> np.ndarray:
+        "Signed distance to the edge at each point, by bilinear interpolation of the grid"
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        rows, columns = self.values.shape
+        x = np.clip((points[:, 0] - self.left) / self.resolution, 0, columns - 1)
+        y = np.clip((points[:, 1] - self.bottom) / self.resolution, 0, rows - 1)
+        i = np.minimum(x.astype(int), columns - 2)
+        j = np.minimum(y.astype(int), rows - 2)
+        tx = x - i
+        ty = y - j
+        values = (
+            self.values[j, i] * (1 - tx) * (1 - ty)
+            + self.values[j, i + 1] * tx * (1 - ty)
+            + self.values[j + 1, i] * (1 - tx) * ty
+            + self.values[j + 1, i + 1] * tx * ty
+        )
+
+        # Points beyond the grid are outside the shape, add the distance to the grid
+        offsets = points - np.stack(
+            [self.left + x * self.resolution, self.bottom + y * self.resolution], axis=1
+        )
+        return values + np.sqrt((offsets * offsets).sum(axis=1))
+
+    def contains(self, points) -> np.ndarray:
+        "Boolean mask which is True for points inside the shape"
+        return self.distance(points) < 0
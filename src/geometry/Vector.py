@@ -2,10 +2,11 @@ import math
 import collision
 
 import drawSvg as draw
-from multimethod import multimethod
 
 
 class Vector:
+    __slots__ = ("x", "y", "label")
+
     x: float
     y: float
     label: str | None
@@ -35,6 +36,25 @@ class Vector:
     def __sub__(self, other) -> "Vector":
         return Vector(self.x - other.x, self.y - other.y)
 
+    # In place versions change this vector rather than making a new one
+    def __iadd__(self, other) -> "Vector":
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other) -> "Vector":
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, scale: float) -> "Vector":
+        self.x *= scale
+        self.y *= scale
+        return self
+
+    def __itruediv__(self, divisor: float) -> "Vector":
+        return self.__imul__(1 / divisor)
+
     def __str__(self) -> str:
         return "({}, {})".format(self.x, self.y)
 
@@ -120,39 +140,37 @@ class Vector:
     def squareDown(self, amount):
         if isinstance(amount, Vector):
             return self.squareDownToPoint(amount)
-        return self + Vector(0, -amount)
+        return Vector(self.x, self.y - amount)
 
     def squareDownToPoint(self, point: "Vector"):
         return Vector(self.x, point.y)
 
-    @multimethod
-    def squareUp(self, amount: float):
-        return self + Vector(0, amount)
+    def squareUp(self, amount):
+        if isinstance(amount, Vector):
+            return self.squareUpToPoint(amount)
+        return Vector(self.x, self.y + amount)
 
-    @squareUp.register
     def squareUpToPoint(self, point: "Vector"):
         return Vector(self.x, point.y)
 
-    @multimethod
-    def squareRight(self, amount: float):
-        return self + Vector(amount, 0)
+    def squareRight(self, amount):
+        if isinstance(amount, Vector):
+            return self.squareRightToPoint(amount)
+        return Vector(self.x + amount, self.y)
 
-    @squareRight.register
     def squareRightToPoint(self, point: "Vector"):
         return Vector(point.x, self.y)
 
-    @multimethod
-    def squareLeft(self, amount: float):
-        return self + Vector(-amount, 0)
+    def squareLeft(self, amount):
+        if isinstance(amount, Vector):
+            return self.squareLeftToPoint(amount)
+        return Vector(self.x - amount, self.y)
 
-    @squareLeft.register
     def squareLeftToPoint(self, point: "Vector"):
         return Vector(point.x, self.y)
 
     def move(self, x, y):
-        new = Vector(self.x + x, self.y + y)
-        new.label = self.label
-        return new
+        return Vector(self.x + x, self.y + y, self.label)
 
     def moveLeft(self, amount: float):
         return self.move(-amount, 0)
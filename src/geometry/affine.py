@@ -0,0 +1,35 @@
+import numpy as np
+
+# 3×3 affine matrices for 2D row vectors [x, y, 1], like the 4×4 ones in
+# matrix_transformations. Applying A and then B is A @ B
+
+
+def translation(x=0.0, y=0.0) -> np.ndarray:
+    return np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [x, y, 1.0]])
+
+
+def scaling(x=1.0, y=1.0) -> np.ndarray:
+    return np.array([[x, 0.0, 0.0], [0.0, y, 0.0], [0.0, 0.0, 1.0]])
+
+
+def horizontal_flip(mirror_x: float) -> np.ndarray:
+    "Mirror in the vertical line x = mirror_x"
+    return scaling(-1.0, 1.0) @ translation(2 * mirror_x, 0.0)
+
+
+def apply(matrix: np.ndarray, coordinates: np.ndarray) -> np.ndarray:
+    "Transform an N×2 array of points"
+    return (
+        coordinates[:, :1] * matrix[0, :2]
+        + coordinates[:, 1:] * matrix[1, :2]
+        + matrix[2, :2]
+    )
+
+
+def is_axis_aligned(matrix: np.ndarray) -> bool:
+    "True if the matrix only scales, flips and translates, so boxes stay boxes"
+    return matrix[0, 1] == 0 and matrix[1, 0] == 0
+
+
+def is_invertible(matrix: np.ndarray) -> bool:
+    return np.linalg.det(matrix[:2, :2]) != 0
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 def normalizeAngle(angle: float):
     while angle > math.pi:
@@ -20,11 +22,29 @@ def clockwiseDifference(a, b) -> float:
 def anticlockwiseDifference(a, b):
     return clockwiseDifference(b, a)
 
+
 def shortest_turn(a: float, b: float):
-    clockwise = clockwiseDifference(a,b)
-    anticlockwise= anticlockwiseDifference(a,b)
-    if abs(clockwise) < abs(anticlockwise):
+    "The turn from angle a to angle b, whichever way round is shorter"
+    clockwise = clockwiseDifference(a, b)
+    anticlockwise = anticlockwiseDifference(a, b)
+    if clockwise < anticlockwise:
         return clockwise
     else:
-        return anticlockwise
+        return -anticlockwise
+
+
+def shortest_turns(a, b):
+    "shortest_turn for arrays of angles between -pi and pi"
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+
+    def clockwise(a, b):
+        b = np.where(b > a + 2 * math.pi, b - 2 * math.pi, b)
+        b = np.where(b < a, b + 2 * math.pi, b)
+        return b - a
 
+    clockwise_turns = clockwise(a, b)
+    anticlockwise_turns = clockwise(b, a)
+    return np.where(
+        clockwise_turns < anticlockwise_turns, clockwise_turns, -anticlockwise_turns
+    )
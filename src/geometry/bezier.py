@@ -1,8 +1,45 @@
+import numpy as np
+
+from src.geometry.coordinates import ragged_offsets
 from src.geometry.Group import Group
 from src.geometry.Shape import Shape, dashed
 from src.geometry.Vector import Vector
 
 
+def bernstein_matrix(ts) -> np.ndarray:
+    "Rows of cubic Bernstein weights, so that matrix @ control points gives B(t) for each t"
+    ts = np.asarray(ts, dtype=np.float64)
+    s = 1.0 - ts
+    return np.stack([s * s * s, 3 * s * s * ts, 3 * s * ts * ts, ts * ts * ts], axis=-1)
+
+
+def flattening_steps(controls: np.ndarray, tolerance: float) -> np.ndarray:
+    """Number of equal steps in t for each cubic so its chords are within tolerance of it.
+
+    Uses Wang's formula, with the controls of M cubics as an M×4×2 array.
+    """
+    if tolerance <= 0:
+        raise ValueError(
+            "The tolerance has to be greater than 0, got {}".format(tolerance)
+        )
+    second_differences = controls[:, :-2] - 2 * controls[:, 1:-1] + controls[:, 2:]
+    bend = np.sqrt((second_differences**2).sum(axis=2)).max(axis=1)
+    return np.maximum(1, np.ceil(np.sqrt(3 * bend / (4 * tolerance)))).astype(int)
+
+
+def flatten_cubics(controls: np.ndarray, tolerance: float) -> np.ndarray:
+    """Points along a chain of M cubics (an M×4×2 array of controls), where each one
+    starts at the end of the last, with just enough points to be within tolerance"""
+    steps = flattening_steps(controls, tolerance)
+
+    # Every t except 1 for each curve, with the end of the last curve added after
+    curve, offsets = ragged_offsets(steps)
+    ts = offsets / steps[curve]
+    weights = bernstein_matrix(ts)
+    points = np.einsum("ij,ijk->ik", weights, controls[curve])
+    return np.concatenate([points, controls[-1:, 3]])
+
+
 class BezierCurve:
     def __init__(self, p0: Vector, p1: Vector, p2: Vector, p3: Vector):
         self.p0 = p0
@@ -10,6 +47,11 @@ class BezierCurve:
         self.p2 = p2
         self.p3 = p3
 
+    @property
+    def controls(self) -> np.ndarray:
+        "The four control points as a 4×2 array"
+        return np.array([p.tuple for p in (self.p0, self.p1, self.p2, self.p3)])
+
     def B(self, t):
 
         return (
@@ -19,11 +61,22 @@ class BezierCurve:
             + self.p3 * pow(t, 3.0)
         )
 
+    def coordinates(self, numberOfPoints) -> np.ndarray:
+        "Evenly spaced points in t as an N×2 array"
+        return bernstein_matrix(np.linspace(0, 1, numberOfPoints)) @ self.controls
+
     def points(self, numberOfPoints):
-        return [self.B(t / (numberOfPoints - 1)) for t in range(0, numberOfPoints)]
+        return [Vector(x, y) for x, y in self.coordinates(numberOfPoints).tolist()]
+
+    def flatten(self, tolerance=0.1) -> np.ndarray:
+        "Points along the curve as an N×2 array, with chords within tolerance of the curve"
+        return flatten_cubics(self.controls[np.newaxis], tolerance)
 
-    def shape(self, numberOfPoints):
-        return Shape(self.points(numberOfPoints))
+    def shape(self, numberOfPoints=None, tolerance=0.1):
+        "The curve as a shape, with a set number of points or enough for a tolerance"
+        if numberOfPoints is None:
+            return Shape(self.flatten(tolerance))
+        return Shape(self.coordinates(numberOfPoints))
 
     def demo(self):
         return Group(
@@ -0,0 +1,55 @@
+import numpy as np
+
+from src.geometry.Vector import Vector
+
+
+def coordinate_array(points) -> np.ndarray:
+    "Convert Vectors, (x, y) pairs or an existing array into a new N×2 float64 array"
+    if isinstance(points, np.ndarray):
+        return np.array(points, dtype=np.float64).reshape(-1, 2)
+    return np.array(
+        [(p.x, p.y) if isinstance(p, Vector) else tuple(p) for p in points],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+
+
+def remove_consecutive_duplicates(coordinates: np.ndarray) -> np.ndarray:
+    "Drop any point which is identical to the one before it"
+    if len(coordinates) < 2:
+        return coordinates
+    keep = np.ones(len(coordinates), dtype=bool)
+    keep[1:] = np.any(coordinates[1:] != coordinates[:-1], axis=1)
+    return coordinates[keep]
+
+
+def ragged_offsets(counts: np.ndarray):
+    """Expand groups of the given sizes into one entry per member, giving the group of
+    each entry and its position within the group.
+
+    For sizes [2, 3] the groups are [0, 0, 1, 1, 1] and the offsets [0, 1, 0, 1, 2].
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    groups = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(groups)) - (np.cumsum(counts) - counts)[groups]
+    return groups, offsets
+
+
+def points_after(drawn: np.ndarray, coordinates: np.ndarray) -> np.ndarray:
+    """The points line_to would add going through each row of an N×2 array after the
+    points drawn so far, leaving out any the same as the point before them"""
+    if len(drawn) > 0:
+        coordinates = np.concatenate([drawn[-1:], coordinates])
+        return remove_consecutive_duplicates(coordinates)[1:]
+    return remove_consecutive_duplicates(coordinates)
+
+
+def plain_numbers(coordinates: np.ndarray) -> list:
+    """The values of an array as a flat list of Python numbers, with whole numbers as
+    ints so they are written without a trailing .0"""
+    return [int(v) if v.is_integer() else v for v in coordinates.ravel().tolist()]
+
+
+def vectors(coordinates: np.ndarray):
+    "Create a list of Vector objects from an N×2 array"
+    values = plain_numbers(coordinates)
+    return [Vector(x, y) for x, y in zip(values[::2], values[1::2])]
@@ -0,0 +1,128 @@
+import math
+
+import numpy as np
+
+from src.geometry.coordinates import ragged_offsets
+
+joins = ("miter", "bevel", "round")
+
+# Largest angle between two points of a round join
+default_round_step = math.radians(10)
+
+
+def segment_directions(coordinates: np.ndarray):
+    "Unit tangent and unit normal (the tangent turned anticlockwise) of each segment"
+    vectors = coordinates[1:] - coordinates[:-1]
+    lengths = np.sqrt((vectors * vectors).sum(axis=1))
+    if np.any(lengths == 0):
+        raise ValueError("Cannot offset a poly line with zero length segments")
+    tangents = vectors / lengths[:, np.newaxis]
+    normals = np.stack([-tangents[:, 1], tangents[:, 0]], axis=1)
+    return tangents, normals
+
+
+def offset_polyline(
+    coordinates: np.ndarray,
+    distance,
+    join: str = "miter",
+    miter_limit: float | None = None,
+    closed: bool = False,
+    round_step: float = default_round_step,
+    directions=None,
+) -> np.ndarray:
+    """Offset every segment of a poly line along its normal and join the results.
+
+    The distance is either one number or one per segment, positive distances are to
+    the left of the direction of travel. Where offset segments meet on the inside of
+    a turn they are cut at their intersection. On the outside of a turn `join` decides
+    how they are connected: "miter" extends them to meet, "bevel" connects their ends
+    with a straight line and "round" with an arc. Miters longer than `miter_limit`
+    times the distance are bevelled. A closed poly line also joins its last segment
+    to its first one.
+    """
+    if join not in joins:
+        raise ValueError("Unknown join {}, expected one of {}".format(join, joins))
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    if len(coordinates) < 2:
+        raise ValueError("Cannot offset a poly line with less than two points")
+    tangents, normals = directions or segment_directions(coordinates)
+    number_of_segments = len(tangents)
+    distances = np.broadcast_to(
+        np.asarray(distance, dtype=np.float64), (number_of_segments,)
+    )
+
+    # The two segments meeting at each vertex in the output
+    if closed:
+        before = np.arange(-1, number_of_segments - 1) % number_of_segments
+        after = np.arange(number_of_segments)
+        vertices = coordinates[:-1]
+    else:
+        before = np.arange(number_of_segments - 1)
+        after = before + 1
+        vertices = coordinates[1:-1]
+    t1, n1, d1 = tangents[before], normals[before], distances[before]
+    t2, n2, d2 = tangents[after], normals[after], distances[after]
+
+    # Where the offset lines meet: P + d1 n1 + s t1 with n2 · (d1 n1 + s t1) = d2
+    cross = t1[:, 0] * t2[:, 1] - t1[:, 1] * t2[:, 0]
+    dot = (t1 * t2).sum(axis=1)
+    straight = np.abs(cross) < 1e-12
+    s = np.divide(
+        d2 - d1 * dot,
+        -cross,
+        out=np.zeros(len(cross)),
+        where=~straight,
+    )
+    meetings = vertices + d1[:, np.newaxis] * n1 + s[:, np.newaxis] * t1
+
+    # A turn away from the offset side leaves a gap on the outside to be filled
+    turns = np.arctan2(cross, dot)
+    doubles_back = straight & (dot < 0)
+    outside = ~straight & (cross * np.where(d1 != 0, d1, d2) < 0)
+    steps = straight & ~doubles_back & (d1 != d2)
+    if join == "miter":
+        if np.any(doubles_back & (d1 != 0)):
+            raise ValueError("Cannot miter a poly line which turns back on itself")
+        cut = steps
+        if miter_limit is not None:
+            miter_lengths = np.sqrt(((meetings - vertices) ** 2).sum(axis=1))
+            limits = miter_limit * np.maximum(np.abs(d1), np.abs(d2))
+            cut = cut | (outside & (miter_lengths > limits))
+    else:
+        cut = steps | doubles_back | outside
+
+    # Each vertex becomes the meeting point, or if it is cut the ends of both offset
+    # segments, with the points of an arc between them for a round join
+    arc_steps = np.zeros(len(cross), dtype=int)
+    if join == "round":
+        arc_steps[cut & ~steps] = np.ceil(np.abs(turns[cut & ~steps]) / round_step) - 1
+    counts = np.where(cut, 2 + arc_steps, 1)
+    first_index = np.cumsum(counts) - counts
+    joined = np.repeat(meetings, counts, axis=0)
+
+    centers = vertices[cut]
+    radius_before = d1[cut, np.newaxis] * n1[cut]
+    radius_after = d2[cut, np.newaxis] * n2[cut]
+    joined[first_index[cut]] = centers + radius_before
+    joined[first_index[cut] + counts[cut] - 1] = centers + radius_after
+
+    if join == "round":
+        # Turning back on itself goes round the outside of the end
+        sweeps = np.where(doubles_back, -math.pi * np.sign(d1), turns)[cut]
+        start_angles = np.arctan2(radius_before[:, 1], radius_before[:, 0])
+        steps_per_arc = arc_steps[cut]
+        arc, step = ragged_offsets(steps_per_arc)
+        fraction = (step + 1) / (steps_per_arc[arc] + 1)
+        angles = start_angles[arc] + sweeps[arc] * fraction
+        radii = np.abs(d1[cut][arc]) + fraction * (
+            np.abs(d2[cut][arc]) - np.abs(d1[cut][arc])
+        )
+        joined[first_index[cut][arc] + 1 + step] = centers[arc] + radii[
+            :, np.newaxis
+        ] * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+    if closed:
+        return np.concatenate([joined, joined[:1]])
+    first = coordinates[0] + distances[0] * normals[0]
+    last = coordinates[-1] + distances[-1] * normals[-1]
+    return np.concatenate([[first], joined, [last]])
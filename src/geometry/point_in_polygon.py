@@ -0,0 +1,43 @@
+import numpy as np
+
+from src.geometry.coordinates import ragged_offsets
+
+
+def polygon_edges(coordinates: np.ndarray):
+    "Start and end coordinates of every edge of a polygon, closing it if needed"
+    if len(coordinates) > 1 and np.all(coordinates[0] == coordinates[-1]):
+        closed = coordinates
+    else:
+        closed = np.concatenate([coordinates, coordinates[:1]])
+    return closed[:-1], closed[1:]
+
+
+def points_in_polygon(points: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """Crossing number test of M points against the N edges of a polygon.
+
+    Returns a boolean mask which is True for points with an odd number of edges
+    crossing a ray from them in the positive x direction.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(starts) == 0 or len(points) == 0:
+        return np.zeros(len(points), dtype=bool)
+
+    # Sort the points by y, so the points level with each edge are a contiguous run.
+    # The range is half open, so a vertex on the ray is only counted for one edge
+    order = np.argsort(points[:, 1], kind="stable")
+    sorted_y = points[order, 1]
+    low = np.minimum(starts[:, 1], ends[:, 1])
+    high = np.maximum(starts[:, 1], ends[:, 1])
+    first = np.searchsorted(sorted_y, low, side="left")
+    counts = np.searchsorted(sorted_y, high, side="left") - first
+
+    # One entry for every edge and point level with it
+    edges, offsets = ragged_offsets(counts)
+    candidates = order[first[edges] + offsets]
+
+    a = starts[edges]
+    b = ends[edges]
+    x, y = points[candidates, 0], points[candidates, 1]
+    crossing_x = a[:, 0] + (y - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    crossings = np.bincount(candidates[x < crossing_x], minlength=len(points))
+    return crossings % 2 == 1
@@ -0,0 +1,66 @@
+import numpy as np
+
+# Roughly how many point/segment pairs to measure at once, to limit memory use
+chunk_size = 1 << 20
+
+
+def project_onto_segments(points: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """Find the closest point on each segment to each point, using numpy broadcasting.
+
+    Returns the closest coordinates, the clamped projection parameter (0 at the start
+    of the segment, 1 at the end) and the distance.
+    """
+    vectors = ends - starts
+    squared_lengths = (vectors * vectors).sum(axis=-1)
+    along = ((points - starts) * vectors).sum(axis=-1)
+    progress = np.divide(
+        along,
+        squared_lengths,
+        out=np.zeros(np.broadcast(along, squared_lengths).shape),
+        where=squared_lengths > 0,
+    )
+    progress = np.clip(progress, 0.0, 1.0)
+    closest_points = starts + vectors * progress[..., np.newaxis]
+    offsets = points - closest_points
+    distances = np.sqrt((offsets * offsets).sum(axis=-1))
+    return closest_points, progress, distances
+
+
+def closest_on_polyline(points: np.ndarray, coordinates: np.ndarray):
+    """Measure the distance from M points to every one of the N segments of a poly line.
+
+    Returns, for each point, the index of the closest segment (the first one if there
+    is a tie), the closest coordinates, the distance to them and how far along the
+    poly line they are.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    starts = coordinates[np.newaxis, :-1]
+    ends = coordinates[np.newaxis, 1:]
+    number_of_segments = starts.shape[1]
+    if number_of_segments == 0:
+        raise ValueError("Cannot measure the distance to a shape with no segments")
+    vectors = ends[0] - starts[0]
+    lengths = np.sqrt((vectors * vectors).sum(axis=-1))
+    cumulative_lengths = np.concatenate([[0.0], np.cumsum(lengths)])
+
+    indices = np.empty(len(points), dtype=int)
+    closest_points = np.empty((len(points), 2))
+    distances = np.empty(len(points))
+    lengths_along = np.empty(len(points))
+
+    rows = max(1, chunk_size // number_of_segments)
+    for first in range(0, len(points), rows):
+        chunk = slice(first, first + rows)
+        chunk_closest, progress, chunk_distances = project_onto_segments(
+            points[chunk, np.newaxis, :], starts, ends
+        )
+        winners = chunk_distances.argmin(axis=1)
+        picked = np.arange(len(winners))
+        indices[chunk] = winners
+        closest_points[chunk] = chunk_closest[picked, winners]
+        distances[chunk] = chunk_distances[picked, winners]
+        lengths_along[chunk] = (
+            cumulative_lengths[winners] + progress[picked, winners] * lengths[winners]
+        )
+
+    return indices, closest_points, distances, lengths_along
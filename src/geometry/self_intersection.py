@@ -0,0 +1,192 @@
+import numpy as np
+
+from src.geometry.coordinates import ragged_offsets, remove_consecutive_duplicates
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+
+
+# Regions are split into quarters until they hold at most this many segments, and
+# pairs of segments are made and tested in chunks of about this many at a time
+region_size_limit = 32
+pair_chunk_size = 1 << 18
+maximum_depth = 64
+
+
+def _pairs_in_groups(sizes: np.ndarray, chunk_size: int = pair_chunk_size):
+    "Chunks of the positions of every pair a < b within consecutive groups of the sizes"
+    groups, positions = ragged_offsets(sizes)
+    counts = sizes[groups] - positions - 1
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        before = ends[start] - counts[start]
+        stop = max(start + 1, np.searchsorted(ends, before + chunk_size, side="right"))
+        a, offsets = ragged_offsets(counts[start:stop])
+        a += start
+        yield a, a + 1 + offsets
+        start = stop
+
+
+def _pairs_in_regions(segments, regions, lows, highs):
+    "Chunks of pairs i < j of segments in the same region whose boxes overlap"
+    order = np.argsort(regions, kind="stable")
+    segments = segments[order]
+    _, sizes = np.unique(regions[order], return_counts=True)
+    for a, b in _pairs_in_groups(sizes):
+        i = np.minimum(segments[a], segments[b])
+        j = np.maximum(segments[a], segments[b])
+        overlap = np.all((lows[i] <= highs[j]) & (lows[j] <= highs[i]), axis=1)
+        yield i[overlap], j[overlap]
+
+
+def candidate_pairs(lows: np.ndarray, highs: np.ndarray):
+    """Chunks of pairs of segments, i < j, whose bounding boxes overlap.
+
+    The box round all the segments is split into quarters, and every quarter holding
+    more than region_size_limit segments is split again, so dense clusters end up in
+    small regions of their own. Segments go in every region their box touches and only
+    segments sharing a region are paired, so the same pair can come up more than once.
+    A region is left whole once splitting it would mostly copy its segments into
+    several quarters, as where many long segments cross in one place.
+    """
+    segments = np.arange(len(lows))
+    regions = np.zeros(len(lows), dtype=np.int64)
+    region_lows = lows.min(axis=0, keepdims=True)
+    size = (highs.max(axis=0) - region_lows[0]).max()
+    region_sizes = np.array([size if size > 0 else 1.0])
+
+    for _ in range(maximum_depth):
+        counts = np.bincount(regions, minlength=len(region_sizes))
+        crowded = counts[regions] > region_size_limit
+        yield from _pairs_in_regions(segments[~crowded], regions[~crowded], lows, highs)
+        segments, regions = segments[crowded], regions[crowded]
+        if len(segments) == 0:
+            return
+
+        # The quarters each segment's box touches
+        halves = (region_sizes[regions] / 2)[:, np.newaxis]
+        origins = region_lows[regions]
+        first = np.clip(np.floor((lows[segments] - origins) / halves), 0, 1)
+        last = np.clip(np.floor((highs[segments] - origins) / halves), 0, 1)
+        first = first.astype(np.int64)
+        spans = last.astype(np.int64) - first + 1
+        sizes = spans[:, 0] * spans[:, 1]
+
+        copies = np.bincount(regions, weights=sizes, minlength=len(region_sizes))
+        stuck = copies[regions] > 2 * counts[regions]
+        yield from _pairs_in_regions(segments[stuck], regions[stuck], lows, highs)
+        keep = ~stuck
+        segments, regions = segments[keep], regions[keep]
+        first, spans, sizes = first[keep], spans[keep], sizes[keep]
+        if len(segments) == 0:
+            return
+
+        entries, within = ragged_offsets(sizes)
+        x = first[entries, 0] + within % spans[entries, 0]
+        y = first[entries, 1] + within // spans[entries, 0]
+        quarters, regions = np.unique(
+            regions[entries] * 4 + y * 2 + x, return_inverse=True
+        )
+        segments = segments[entries]
+        parents = quarters // 4
+        corners = np.stack([quarters % 2, quarters // 2 % 2], axis=1)
+        region_sizes = region_sizes[parents] / 2
+        region_lows = region_lows[parents] + corners * region_sizes[:, np.newaxis]
+
+    yield from _pairs_in_regions(segments, regions, lows, highs)
+
+
+def _meetings(i, j, starts, ends):
+    "The pairs of segments which cross or touch, and how far along segment i they do"
+    r = ends[i] - starts[i]
+    s = ends[j] - starts[j]
+    between = starts[j] - starts[i]
+    denominator = _cross(r, s)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = _cross(between, s) / denominator
+        u = _cross(between, r) / denominator
+    meets = (denominator != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+    return i[meets], j[meets], t[meets]
+
+
+def segment_crossings(coordinates: np.ndarray):
+    """Every place where a poly line crosses or touches itself.
+
+    Returns the indices i < j of the two segments and the points where they meet,
+    ordered by i and then along segment i. Neighbouring segments, including the first
+    and last of a closed poly line, are never counted, nor are parallel segments
+    overlapping along a line.
+    """
+    starts, ends = coordinates[:-1], coordinates[1:]
+    n = len(starts)
+    if n < 3:
+        return np.array([], dtype=int), np.array([], dtype=int), np.empty((0, 2))
+    closed = np.all(coordinates[0] == coordinates[-1])
+
+    found = [(np.array([], dtype=int), np.array([], dtype=int), np.empty(0))]
+    for i, j in candidate_pairs(np.minimum(starts, ends), np.maximum(starts, ends)):
+        apart = j - i > 1
+        if closed:
+            apart &= ~((i == 0) & (j == n - 1))
+        found.append(_meetings(i[apart], j[apart], starts, ends))
+    i, j, t = (np.concatenate(parts) for parts in zip(*found))
+
+    # Pairs in more than one region are found more than once
+    _, unique = np.unique(i * n + j, return_index=True)
+    i, j, t = i[unique], j[unique], t[unique]
+    order = np.lexsort((t, i))
+    i, j, t = i[order], j[order], t[order]
+    return i, j, starts[i] + (ends[i] - starts[i]) * t[:, np.newaxis]
+
+
+def remove_loops(coordinates: np.ndarray) -> np.ndarray:
+    """Cut out the loops where a poly line crosses itself.
+
+    Each loop is replaced by the point where it crosses. For a closed poly line the
+    shorter of the two sides of the crossing is cut out. Each round cuts out every loop
+    which doesn't share a segment with a shorter one, then looks for crossings again.
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    while True:
+        i, j, points = segment_crossings(coordinates)
+        if len(i) == 0:
+            return coordinates
+        segment_lengths = np.sqrt((np.diff(coordinates, axis=0) ** 2).sum(axis=1))
+        cumulative_lengths = np.concatenate([[0.0], np.cumsum(segment_lengths)])
+
+        # The length of the loop from the crossing on segment i back to it on segment j
+        loops = (
+            np.sqrt(((coordinates[i + 1] - points) ** 2).sum(axis=1))
+            + cumulative_lengths[j]
+            - cumulative_lengths[i + 1]
+            + np.sqrt(((points - coordinates[j]) ** 2).sum(axis=1))
+        )
+        closed = np.all(coordinates[0] == coordinates[-1])
+        others = cumulative_lengths[-1] - loops if closed else np.full(len(i), np.inf)
+
+        shortest = int(np.argmin(np.minimum(loops, others)))
+        if others[shortest] < loops[shortest]:
+            # Keep just the loop, which leaves nothing else to cut this round
+            crossing = points[shortest : shortest + 1]
+            coordinates = np.concatenate(
+                [crossing, coordinates[i[shortest] + 1 : j[shortest] + 1], crossing]
+            )
+        else:
+            # Shortest first, take each loop whose segments are clear of those taken
+            taken = np.zeros(len(coordinates) - 1, dtype=bool)
+            cuts = []
+            for k in np.argsort(loops, kind="stable").tolist():
+                if loops[k] <= others[k] and not taken[i[k] : j[k] + 1].any():
+                    taken[i[k] : j[k] + 1] = True
+                    cuts.append(k)
+            cuts.sort(key=lambda k: i[k])
+            pieces = []
+            start = 0
+            for k in cuts:
+                pieces += [coordinates[start : i[k] + 1], points[k : k + 1]]
+                start = j[k] + 1
+            pieces.append(coordinates[start:])
+            coordinates = np.concatenate(pieces)
+        coordinates = remove_consecutive_duplicates(coordinates)
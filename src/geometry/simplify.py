@@ -0,0 +1,109 @@
+import numpy as np
+
+from src.geometry.coordinates import ragged_offsets
+from src.geometry.polyline_distance import project_onto_segments
+
+methods = ("rdp", "visvalingam")
+
+
+def ramer_douglas_peucker(
+    coordinates: np.ndarray, tolerance: float, keep: np.ndarray
+) -> np.ndarray:
+    """Mask of the points to keep so no point is further than tolerance from the result.
+
+    Points already marked in `keep` are always kept, along with the two ends. Every
+    section between kept points is split at its furthest point until they are all close
+    enough, handling all the sections of one round in a single numpy pass.
+    """
+    keep = keep.copy()
+    keep[[0, -1]] = True
+    kept = np.flatnonzero(keep)
+    starts, ends = kept[:-1], kept[1:]
+    while len(starts) > 0:
+        counts = ends - starts - 1
+        has_points = counts > 0
+        starts, ends, counts = starts[has_points], ends[has_points], counts[has_points]
+        if len(starts) == 0:
+            break
+
+        # Distance from the points in each section to the segment joining its ends
+        section, offsets = ragged_offsets(counts)
+        first = np.cumsum(counts) - counts
+        inner = starts[section] + 1 + offsets
+        _, _, distances = project_onto_segments(
+            coordinates[inner],
+            coordinates[starts[section]],
+            coordinates[ends[section]],
+        )
+
+        # The furthest point in each section, the first if there is a tie
+        order = np.lexsort((-distances, section))
+        furthest = order[first]
+        split = distances[furthest] > tolerance
+        splits = inner[furthest[split]]
+        keep[splits] = True
+        starts = np.concatenate([starts[split], splits])
+        ends = np.concatenate([splits, ends[split]])
+    return keep
+
+
+def triangle_areas(coordinates: np.ndarray, before, middle, after) -> np.ndarray:
+    a = coordinates[before]
+    b = coordinates[middle]
+    c = coordinates[after]
+    return (
+        np.abs(
+            (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1])
+            - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])
+        )
+        / 2
+    )
+
+
+def visvalingam_whyatt(
+    coordinates: np.ndarray, tolerance: float, keep: np.ndarray
+) -> np.ndarray:
+    """Mask of the points to keep after removing points which make small triangles.
+
+    A point is removed while the triangle it makes with its remaining neighbours has an
+    area less than tolerance². Each round removes every point whose triangle is below
+    the limit and smaller than both of its neighbours', so no two neighbours are removed
+    at once, and the areas are then recalculated.
+    """
+    fixed = keep.copy()
+    fixed[[0, -1]] = True
+    remaining = np.arange(len(coordinates))
+    limit = tolerance * tolerance
+    while len(remaining) > 2:
+        areas = np.full(len(remaining), np.inf)
+        areas[1:-1] = triangle_areas(
+            coordinates, remaining[:-2], remaining[1:-1], remaining[2:]
+        )
+        areas[fixed[remaining]] = np.inf
+        neighbours = np.minimum(
+            np.concatenate([[np.inf], areas[:-1]]),
+            np.concatenate([areas[1:], [np.inf]]),
+        )
+        # Break ties between equal neighbours by keeping the later point
+        earlier = np.concatenate([[np.inf], areas[:-1]])
+        remove = (areas < limit) & (areas <= neighbours) & (areas != earlier)
+        if not np.any(remove):
+            break
+        remaining = remaining[~remove]
+
+    result = np.zeros(len(coordinates), dtype=bool)
+    result[remaining] = True
+    return result
+
+
+def simplify(
+    coordinates: np.ndarray, tolerance: float, keep: np.ndarray, method: str = "rdp"
+) -> np.ndarray:
+    "Mask of the points to keep when simplifying a poly line"
+    if method == "rdp":
+        return ramer_douglas_peucker(coordinates, tolerance, keep)
+    elif method == "visvalingam":
+        return visvalingam_whyatt(coordinates, tolerance, keep)
+    raise ValueError(
+        "Unknown simplification method {}, expected one of {}".format(method, methods)
+    )
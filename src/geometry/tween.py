@@ -3,59 +3,79 @@ from src.geometry.Group import Group
 from src.geometry.Vector import Vector
 from src.geometry.Shape import Shape
 import numpy as np
-from src.geometry.Vector import Vector, polar
 
-from src.geometry.angles import shortest_turn
+from src.geometry.angles import shortest_turns
 
-def pointwise_tween(a: Shape, b: Shape, phase: float, resolution = 1.0) -> Shape:
-    larger_length = max(a.length, b.length)
 
-    shape = Shape()
-    for w in np.arange(0, 1, resolution / larger_length):
-        p = a.pointAlong(w * a.length)
-        q = b.pointAlong(w * b.length)
-        r = p + (q-p) * phase
-        shape.line_to(r)
-    return shape
+class Tween:
+    """Tweens between two shapes, sampling both once at the same fractions of their
+    lengths so any number of phases can be made from the one table.
 
+    Tweened frames turn each step part of the way from the direction of a to the
+    direction of b, pointwise frames just move each sample in a straight line.
+    """
 
-def tween(a: Shape, b: Shape, phase: float, resolution = 1.0) -> Shape:
-    larger_length = max(a.length, b.length)
-    step = resolution / larger_length
+    def __init__(self, a: Shape, b: Shape, resolution=1.0):
+        step = resolution / max(a.length, b.length)
+        ws = np.arange(0, 1, step)
+        self.p = a.points_along(ws * a.length)
+        self.q = b.points_along(ws * b.length)
+        self.start_a = a.coordinates[0]
+        self.start_b = b.coordinates[0]
 
-    shape = Shape()
-    shape.start_at(a.first_point * (1.0-phase) + b.first_point * phase)
+        # The steps between samples, leaving out the one from the start
+        step_p = np.diff(self.p[1:], axis=0)
+        step_q = np.diff(self.q[1:], axis=0)
+        self.angles = np.arctan2(step_p[:, 1], step_p[:, 0])
+        # How far each step of a turns to line up with the same step of b
+        self.turns = shortest_turns(self.angles, np.arctan2(step_q[:, 1], step_q[:, 0]))
+        self.lengths_a = np.sqrt((step_p * step_p).sum(axis=1))
+        self.lengths_b = np.sqrt((step_q * step_q).sum(axis=1))
 
-    last_p = None
-    last_q = None
-    for w in np.arange(step, 1.0, step):
-        p = a.pointAlong(w * a.length)
-        q = b.pointAlong(w * b.length)
-        if last_p:
-            vP = p - last_p
-            vQ = q - last_q
-            turn = vP.angle + shortest_turn(vQ.angle, vP.angle) * phase
-            length = vP.length * (1.0-phase) + phase * vQ.length
-            shape.append(shape.last_point + polar(turn, length))
-        last_p = p
-        last_q = q
+    def coordinates(self, phases) -> np.ndarray:
+        "The points of the tweened frame at each phase as a P×N×2 array"
+        phases = np.asarray(phases, dtype=np.float64).reshape(-1, 1)
+        turns = self.angles + self.turns * phases
+        lengths = self.lengths_a * (1.0 - phases) + self.lengths_b * phases
+        starts = self.start_a * (1.0 - phases) + self.start_b * phases
+        steps = np.stack([np.cos(turns) * lengths, np.sin(turns) * lengths], axis=2)
+        return np.cumsum(np.concatenate([starts[:, np.newaxis], steps], axis=1), axis=1)
 
+    def pointwise_coordinates(self, phases) -> np.ndarray:
+        "The points of the pointwise frame at each phase as a P×N×2 array"
+        phases = np.asarray(phases, dtype=np.float64).reshape(-1, 1, 1)
+        return self.p + (self.q - self.p) * phases
 
-    return shape
+    def frame(self, phase: float) -> Shape:
+        return Shape(self.coordinates([phase])[0])
 
+    def frames(self, phases):
+        "Make the tweened frames one at a time"
+        for phase in phases:
+            yield self.frame(phase)
 
 
-def tween_demo(a: Shape, b:Shape):
+def pointwise_tween(a: Shape, b: Shape, phase: float, resolution=1.0) -> Shape:
+    return Shape(Tween(a, b, resolution).pointwise_coordinates([phase])[0])
+
+
+def tween(a: Shape, b: Shape, phase: float, resolution=1.0) -> Shape:
+    return Tween(a, b, resolution).frame(phase)
+
+
+def tween_demo(a: Shape, b: Shape):
     b = b.translate(Vector(750, 0))
-    step = .05
+    step = 0.05
+    phases = np.arange(step, 1.0, step)
     shapes = []
     shapes.append(a.with_label("A").with_style("arrow"))
-    for phase in np.arange(step, 1.0, step):
-        shapes.append(tween(a, b, phase).with_label("{:.0f}%".format(phase*100)).with_style("arrow"))
+    for phase, shape in zip(phases, Tween(a, b).frames(phases)):
+        shapes.append(
+            shape.with_label("{:.0f}%".format(phase * 100)).with_style("arrow")
+        )
 
     shapes.append(b.with_label("B").with_style("arrow"))
 
     g = Group(*shapes)
 
     return g
-
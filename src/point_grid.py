@@ -23,3 +23,12 @@ def point_grid_over_shape(shape: Shape, cell_width=default_cell_width, margin=0.
         height=shape.height + 2 * margin,
         cell_width=cell_width,
     )
+
+
+def point_grid_inside_shape(
+    shape: Shape, cell_width=default_cell_width, min_distance=0.0, resolution=1.0
+):
+    "Grid points over a closed shape which are at least min_distance inside the edge"
+    points = np.array([p.tuple for p in point_grid_over_shape(shape, cell_width)])
+    distances = shape.signed_distance_field(resolution).distance(points)
+    return [Vector(x, y) for x, y in points[distances < -min_distance].tolist()]
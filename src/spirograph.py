@@ -1,12 +1,28 @@
-from .geometry.Shape import Shape
-from .geometry.Vector import polar, Vector
 import numpy as np
 
-def spiro(angle_function, length: float, resolution: float = 3):
-    shape = Shape().start_at(Vector(0,0))
-    for w in np.arange(0, length, resolution):
-        last_angle = shape.last_segment.angle if shape.number_of_points > 1 else 0
-        angle = last_angle + (angle_function(w) / resolution)
-        next_point = shape.last_point + polar(length=resolution, angle=angle)
-        shape.line_to(next_point)
-    return shape
+from .geometry.Shape import Shape
+
+
+def spiro(angle_function, length: float, resolution: float = 3, vectorized=False):
+    """Draw like a turtle from the origin, taking steps of `resolution` and turning by
+    angle_function(w) / resolution before the step w along.
+
+    angle_function is called once for each step, or with vectorized=True once with a
+    numpy array of every distance, giving an array of turns back.
+    """
+    ws = np.arange(0, length, resolution)
+    if vectorized:
+        turns = np.asarray(angle_function(ws), dtype=np.float64)
+        if turns.shape != ws.shape:
+            raise ValueError(
+                "A vectorized angle function should give {} turns, got shape {}".format(
+                    len(ws), turns.shape
+                )
+            )
+    else:
+        turns = np.fromiter(
+            (angle_function(w) for w in ws.tolist()), dtype=np.float64, count=len(ws)
+        )
+    headings = np.cumsum(turns / resolution)
+    steps = np.stack([np.cos(headings), np.sin(headings)], axis=1) * resolution
+    return Shape(np.cumsum(np.concatenate([np.zeros((1, 2)), steps]), axis=0))
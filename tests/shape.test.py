@@ -0,0 +1,418 @@
+import math
+import unittest
+
+import numpy as np
+
+from src.geometry.bezier import BezierCurve
+from src.geometry.Circle import Circle, arc
+from src.geometry.polyline_distance import closest_on_polyline
+from src.geometry.Shape import Shape, rectangle
+from src.geometry.ShapeBuilder import ShapeBuilder
+from src.geometry.tween import Tween
+from src.geometry.Vector import Vector
+from src.spirograph import spiro
+
+
+class TestShapeMethods(unittest.TestCase):
+    def test_coordinates_are_stored_as_an_array(self):
+        shape = Shape([Vector(0, 0), Vector(0, 0), Vector(10, 0), Vector(10, 5)])
+        self.assertEqual(shape.coordinates.shape, (3, 2))
+        self.assertEqual(shape.coordinates.dtype, np.float64)
+        self.assertEqual(shape.points[1], Vector(10, 0))
+
+    def test_coordinates_are_read_only(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0)])
+        with self.assertRaises(ValueError):
+            shape.coordinates[0, 0] = 5
+
+    def test_whole_numbers_are_written_without_a_decimal_point(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0), Vector(10, 5.5)])
+        self.assertEqual(list(shape.interleavedCoordinates()), [0, 0, 10, 0, 10, 5.5])
+        self.assertEqual(shape.svg_line_only().args["d"], "M0,0 L10,0 L10,-5.5")
+
+    def test_appending_points(self):
+        shape = Shape().start_at(Vector(0, 0))
+        for i in range(1, 100):
+            shape.line_to(Vector(i, 0))
+        shape.line_to(Vector(99, 0))
+        self.assertEqual(shape.number_of_points, 100)
+        self.assertEqual(shape.last_point, Vector(99, 0))
+
+    def test_translate_makes_a_new_shape(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0)])
+        moved = shape.translate(Vector(5, 5))
+        self.assertEqual(moved.first_point, Vector(5, 5))
+        self.assertEqual(shape.first_point, Vector(0, 0))
+
+    def test_chained_transforms(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0), Vector(10, 5)])
+        self.assertEqual(shape.left, 0)
+        moved = shape.scale(2).translate(Vector(5, 5)).flipped_horizontally(0)
+        self.assertEqual((moved.left, moved.right), (-25, -5))
+        self.assertEqual(moved.coordinates.tolist(), [[-5, 5], [-25, 5], [-25, 15]])
+        shape.translate_in_place(Vector(1, 1))
+        moved.line_to(Vector(0, 0))
+        self.assertEqual(shape.number_of_points, 3)
+        self.assertEqual(moved.point(1), Vector(-25, 5))
+
+    def test_derived_shapes_share_points_until_changed(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0)])
+        labelled = shape.with_label("a").with_style("dashed")
+        self.assertTrue(np.shares_memory(labelled.coordinates, shape.coordinates))
+        labelled.line_to(Vector(10, 10))
+        reversed = shape.reverse()
+        shape.translate_in_place(Vector(0, 5))
+        self.assertEqual(labelled.coordinates.tolist(), [[0, 0], [10, 0], [10, 10]])
+        self.assertEqual(reversed.coordinates.tolist(), [[10, 0], [0, 0]])
+        self.assertEqual(shape.coordinates.tolist(), [[0, 5], [10, 5]])
+
+    def test_drawing_on_a_shape_after_sharing_it(self):
+        for share in (Shape.copy, lambda s: s.with_style("dashed"), Shape.reverse):
+            shape = Shape().start_at(Vector(0, 0))
+            for i in range(1, 5):
+                shape.line_to(Vector(i, 0))
+            shared = share(shape)
+            shape.line_to(Vector(4, 4)).line(-4, 0).close()
+            self.assertEqual(shape.number_of_points, 8)
+            self.assertEqual(shared.number_of_points, 5)
+        moved = shape.translate(Vector(1, 1))
+        shape.line_to(Vector(1, 1))
+        self.assertEqual(moved.number_of_points, 8)
+
+    def test_measuring_along_a_shape(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0), Vector(10, 10)])
+        self.assertEqual(shape.length, 20)
+        self.assertEqual(shape.point_along(15), Vector(10, 5))
+        self.assertEqual(shape.measureAlong(10).index, 0)
+        with self.assertRaises(ValueError):
+            shape.measureAlong(21)
+
+    def test_length_is_recalculated_after_changes(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0)])
+        self.assertEqual(shape.length, 10)
+        shape.line_to(Vector(10, 10))
+        self.assertEqual(shape.length, 20)
+        shape.translate_in_place(Vector(5, 5))
+        self.assertEqual(shape.point_along(20), Vector(15, 15))
+
+    def test_measuring_many_distances_at_once(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0), Vector(10, 10)])
+        measurements = shape.measure_along_many([0, 5, 15, 20])
+        self.assertEqual(measurements.indices.tolist(), [0, 0, 1, 1])
+        self.assertEqual(
+            measurements.points.tolist(), [[0, 0], [5, 0], [10, 5], [10, 10]]
+        )
+        self.assertEqual(measurements.normals.tolist()[2], [-1, 0])
+        for w, measurement in zip([0, 5, 15, 20], measurements):
+            self.assertEqual(measurement.point, shape.point_along(w))
+        with self.assertRaises(ValueError):
+            shape.points_along([5, 25])
+
+    def test_center_of_mass(self):
+        open_shape = Shape([Vector(0, 0), Vector(30, 0), Vector(30, 10)])
+        self.assertEqual(open_shape.center_of_mass(), Vector(18.75, 1.25))
+        triangle = Shape([Vector(0, 0), Vector(30, 0), Vector(0, 30)]).close()
+        center = triangle.center_of_mass()
+        self.assertAlmostEqual(center.x, 10)
+        self.assertAlmostEqual(center.y, 10)
+
+    def test_bounding_box_follows_changes(self):
+        shape = Shape([Vector(0, 0), Vector(10, 20)])
+        self.assertEqual(shape.top, 20)
+        shape.line_to(Vector(-5, 30))
+        self.assertEqual((shape.left, shape.top), (-5, 30))
+        shape.translate_in_place(Vector(5, 0))
+        self.assertEqual((shape.left, shape.right), (0, 15))
+
+    def test_closest_points_with_a_segment_index(self):
+        zigzag = Shape([Vector(i * 10, (i % 2) * 10) for i in range(100)])
+        self.assertGreaterEqual(zigzag.numberOfSegments, 32)
+        closest = zigzag.closest(Vector(55, 10))
+        self.assertEqual(closest.index, 5)
+        self.assertAlmostEqual(closest.point.x, 52.5)
+        self.assertAlmostEqual(closest.point.y, 7.5)
+        self.assertAlmostEqual(closest.lengthAlong, 5.25 * 200**0.5)
+        measurements = zigzag.closest_many([(55, 10), (-10, 0)])
+        self.assertEqual(measurements.indices.tolist(), [5, 0])
+        self.assertEqual(measurements.points.tolist()[1], [0, 0])
+        # Only a large batch of points is worth building the index for
+        self.assertNotIn("segment_index", zigzag._cache)
+        points = np.random.default_rng(0).uniform(-10, 1000, size=(100, 2))
+        measurements = zigzag.closest_many(points)
+        self.assertIn("segment_index", zigzag._cache)
+        expected = closest_on_polyline(points, zigzag.coordinates)
+        np.testing.assert_allclose(measurements.points, expected[1])
+
+    def test_proximity(self):
+        shape = Shape([Vector(0, 0), Vector(10, 0), Vector(10, 10)])
+        self.assertEqual(shape.proximity(Vector(5, 3)), 3)
+        self.assertEqual(shape.proximity(Vector(13, 14)), 5)
+        self.assertEqual(shape.closest(Vector(12, 4)).lengthAlong, 14)
+
+    def test_signed_distance_field(self):
+        square = rectangle(0, 0, 100, 100)
+        field = square.signed_distance_field(resolution=5)
+        distances = field.distance([(50, 50), (10, 40), (120, 50), (200, 50)])
+        np.testing.assert_allclose(distances, [-50, -10, 20, 100])
+        self.assertEqual(field.contains([(1, 1), (-1, 1)]).tolist(), [True, False])
+        ellipse = Shape(
+            [(100 * math.cos(a), 60 * math.sin(a)) for a in np.arange(0, 6.28, 0.01)]
+        )
+        ellipse.close()
+        field = ellipse.signed_distance_field(resolution=2)
+        rows, columns = field.values.shape
+        xs = field.left + 2 * np.arange(columns)
+        ys = field.bottom + 2 * np.arange(rows)
+        grid = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+        exact = closest_on_polyline(grid, ellipse.coordinates)[2]
+        errors = np.abs(field.values).reshape(-1) - exact
+        self.assertLessEqual(errors[exact < 2].max(), 1e-9)
+        self.assertLessEqual(errors.max(), 2)
+
+    def test_contains(self):
+        # An L shape, open so the closing edge is implied
+        shape = Shape([(0, 0), (20, 0), (20, 10), (10, 10), (10, 20), (0, 20)])
+        points = [(5, 5), (15, 5), (5, 15), (15, 15), (25, 5), (10, 5)]
+        self.assertEqual(
+            shape.contains(points).tolist(), [True, True, True, False, False, True]
+        )
+        self.assertTrue(shape.point_is_inside(Vector(5, 15)))
+
+    def test_parallel_joins(self):
+        corner = Shape([(0, 0), (10, 0), (10, 10)])
+        self.assertEqual(
+            corner.parallel(1).coordinates.tolist(), [[0, 1], [9, 1], [9, 10]]
+        )
+        self.assertEqual(
+            corner.parallel(-1, join="bevel").coordinates.tolist(),
+            [[0, -1], [10, -1], [11, 0], [11, 10]],
+        )
+        rounded = corner.parallel(-1, join="round").coordinates
+        np.testing.assert_allclose(
+            np.hypot(*(rounded[1:-1] - [10, 0]).T), np.ones(len(rounded) - 2)
+        )
+        sharp = Shape([(0, 0), (10, 0), (0, 1)])
+        self.assertEqual(sharp.parallel(-1, miter_limit=4).number_of_points, 4)
+
+    def test_sides_wrap_past_a_first_point_which_is_not_a_corner(self):
+        piece = Shape([(50, 0), (100, 0), (100, 50), (0, 50), (0, 0)]).close()
+        self.assertEqual(piece.corner_indices(), [1, 2, 3, 4])
+        sides = piece.sides()
+        self.assertEqual(len(sides), 4)
+        self.assertEqual(sides[3].coordinates.tolist(), [[0, 0], [50, 0], [100, 0]])
+        self.assertAlmostEqual(piece.angles()[0], math.pi / 2)
+
+    def test_side_selectors(self):
+        piece = Shape([(0, 0), (100, 0), (100, 50), (50, 80), (0, 50)]).close()
+        self.assertEqual(piece.topmost_side().first_point, Vector(100, 50))
+        self.assertEqual(piece.bottommost_side().first_point, Vector(0, 0))
+        self.assertEqual(piece.leftmost_side().first_point, Vector(0, 50))
+        topmost = piece.topmost_sides(2)
+        self.assertEqual(
+            [side.first_point for side in topmost], [Vector(100, 50), Vector(50, 80)]
+        )
+
+    def test_with_allowances(self):
+        # The first point is halfway along the bottom side, which is side 3
+        piece = Shape([(50, 0), (100, 0), (100, 50), (0, 50), (0, 0)]).close()
+        self.assertEqual(piece.side_indices().tolist(), [3, 0, 1, 2, 3])
+        cutting_line = piece.with_allowances({0: 10, 1: 20, 2: 30, 3: 40})
+        self.assertEqual(
+            cutting_line.coordinates.tolist(),
+            [[50, -40], [110, -40], [110, 70], [-30, 70], [-30, -40], [50, -40]],
+        )
+        self.assertEqual(
+            piece.reverse().with_allowances({3: 5}).bounding_box.bottom, -5
+        )
+
+    def test_widths_at(self):
+        diamond = Shape([(0, -10), (10, 0), (0, 10), (-10, 0)]).close()
+        self.assertEqual(
+            diamond.widths_at([-20, -5, 0, 5, 10]).tolist(), [0, 10, 20, 10, 0]
+        )
+        self.assertEqual(diamond.width_at_y_position(2.5), 15)
+        self.assertIsNone(diamond.leftmost_point_at_y_position(11))
+        self.assertEqual(diamond.rightmost_at_y_position(0), Vector(10, 0))
+
+    def test_simplify(self):
+        shape = Shape([(0, 0), (5, 0.1), (10, 0), (10, 5), (10, 10)])
+        for method in ("rdp", "visvalingam"):
+            self.assertEqual(
+                shape.simplify(1, method).coordinates.tolist(),
+                [[0, 0], [10, 0], [10, 10]],
+            )
+        self.assertEqual(shape.simplify(1, keep=[Vector(5, 0.1)]).number_of_points, 4)
+        self.assertEqual(
+            shape.simplify(100, corner_threshhold=None).number_of_points, 2
+        )
+
+    def test_flattening_curves_to_a_tolerance(self):
+        curve = BezierCurve(
+            Vector(0, 0), Vector(0, 50), Vector(50, 50), Vector(50, 100)
+        )
+        for tolerance in (1, 0.1):
+            flattened = Shape(curve.flatten(tolerance))
+            self.assertEqual(flattened.last_point, Vector(50, 100))
+            errors = flattened._closest(curve.coordinates(1001))[2]
+            self.assertLessEqual(errors.max(), tolerance)
+        self.assertLess(Shape(curve.flatten(1)).number_of_points, 20)
+
+    def test_interpolation_matches_the_curves(self):
+        shape = Shape([(0, 0), (10, 0), (15, 8), (5, 12), (-3, 4)])
+        expected = []
+        for curve in shape.interpolationCurves(0.8):
+            expected += curve.points(20)[:-1]
+        np.testing.assert_allclose(
+            shape.interpolate(0.8).coordinates,
+            [[p.x, p.y] for p in expected],
+            atol=1e-12,
+        )
+
+    def test_arcs_to_a_tolerance(self):
+        circle = Circle(Vector(5, 5), 10)
+        angles = np.arange(0, math.pi, math.pi / 100)
+        np.testing.assert_allclose(
+            arc(circle.center, 10, 0, math.pi).coordinates,
+            [[p.x, p.y] for p in map(circle.pointAtAngle, angles)],
+        )
+        for radius in (1, 10, 1000):
+            shape = arc(Vector(5, 5), radius, 0.5, math.pi, tolerance=0.1)
+            self.assertAlmostEqual(
+                shape.last_point.x, 5 + radius * math.cos(0.5 + math.pi)
+            )
+            points = shape.coordinates
+            midpoints = (points[:-1] + points[1:]) / 2
+            sagitta = radius - np.hypot(*(midpoints - 5).T)
+            self.assertLessEqual(sagitta.max(), 0.1)
+        self.assertLess(arc(Vector(0, 0), 1, 0, math.pi, 0.1).number_of_points, 10)
+        self.assertEqual(circle.polyline(tolerance=100).number_of_points, 4)
+
+    def test_tween_frames(self):
+        a = rectangle(0, 0, 40, 20)
+        b = Shape([(0, 0), (30, 30), (60, 0), (90, 30), (120, 0)])
+        tween = Tween(a, b)
+        phases = [0, 0.25, 1]
+        batch = tween.coordinates(phases)
+        for frame, coordinates in zip(tween.frames(phases), batch):
+            np.testing.assert_array_equal(frame.coordinates, coordinates)
+        # The steps follow a and then b, missing only the first from the start
+        np.testing.assert_allclose(
+            np.diff(batch[0], axis=0), np.diff(tween.p[1:], axis=0), atol=1e-9
+        )
+        np.testing.assert_allclose(
+            np.diff(batch[2], axis=0), np.diff(tween.q[1:], axis=0), atol=1e-9
+        )
+        np.testing.assert_allclose(
+            tween.pointwise_coordinates([0.5])[0], (tween.p + tween.q) / 2
+        )
+
+    def test_spiro(self):
+        # Turning a twelfth of the way round at each step draws a dodecagon
+        dodecagon = spiro(lambda w: 2 * math.pi / 12 * 3, 3 * 13)
+        np.testing.assert_allclose(dodecagon.coordinates[12], [0, 0], atol=1e-9)
+        self.assertAlmostEqual(dodecagon.length, 3 * 13)
+        np.testing.assert_allclose(
+            spiro(np.sin, 100, 0.5, vectorized=True).coordinates,
+            spiro(math.sin, 100, 0.5).coordinates,
+        )
+        # Otherwise the function is called exactly once for each step
+        calls = []
+
+        def turn(w):
+            calls.append(w)
+            return len(calls) * 0.03
+
+        np.testing.assert_allclose(
+            spiro(turn, 30).turning_angles(), 0.01 * np.arange(2, 11)
+        )
+        self.assertEqual(calls, list(range(0, 30, 3)))
+        with self.assertRaises(ValueError):
+            spiro(lambda w: 0.1, 30, vectorized=True)
+
+    def test_self_intersections(self):
+        rng = np.random.default_rng(0)
+        walk = Shape(np.cumsum(rng.normal(size=(60, 2)), axis=0))
+        points = walk.coordinates
+        expected = []
+        for i in range(walk.numberOfSegments):
+            for j in range(i + 2, walk.numberOfSegments):
+                p, r = points[i], points[i + 1] - points[i]
+                q, s = points[j], points[j + 1] - points[j]
+                t, u = np.linalg.solve(np.array([r, -s]).T, q - p)
+                if 0 <= t <= 1 and 0 <= u <= 1:
+                    expected.append((i, j))
+        i, j, _ = walk.self_intersections()
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(sorted(zip(i.tolist(), j.tolist())), expected)
+        self.assertTrue(walk.without_loops().is_simple)
+        self.assertTrue(rectangle(0, 0, 10, 10).is_simple)
+
+    def test_self_intersections_of_a_dense_cluster(self):
+        rng = np.random.default_rng(1)
+        cluster = np.cumsum(rng.normal(size=(400, 2)) * 0.05, axis=0)
+        box = [(-300, -300), (300, -300), (300, 300), (-300, 300)]
+        shape = Shape(np.concatenate([box, cluster]))
+        i, j, _ = shape.self_intersections()
+
+        # Every pair of segments at once
+        points = shape.coordinates
+        p, r = points[:-1], points[1:] - points[:-1]
+        cross = r[:, np.newaxis, 0] * r[np.newaxis, :, 1] - (
+            r[:, np.newaxis, 1] * r[np.newaxis, :, 0]
+        )
+        between = p[np.newaxis] - p[:, np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (
+                between[..., 0] * r[np.newaxis, :, 1]
+                - between[..., 1] * r[np.newaxis, :, 0]
+            ) / cross
+            u = (
+                between[..., 0] * r[:, np.newaxis, 1]
+                - between[..., 1] * r[:, np.newaxis, 0]
+            ) / cross
+        meets = (cross != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+        expected = np.argwhere(np.triu(meets, 2))
+        self.assertGreater(len(expected), 100)
+        self.assertEqual(sorted(np.stack([i, j], axis=1).tolist()), expected.tolist())
+
+    def test_removing_loops_from_a_parallel(self):
+        bowl = Shape(
+            [(-20, 5), *arc(Vector(0, 0), 5, math.pi, math.pi, 0.05).points, (20, 5)]
+        )
+        self.assertFalse(bowl.parallel(10).is_simple)
+        inside = bowl.parallel(10, remove_loops=True)
+        self.assertTrue(inside.is_simple)
+        self.assertEqual(inside.number_of_points, 3)
+        self.assertTrue(bowl.parallel(-10, remove_loops=True).is_simple)
+
+    def test_shape_builder(self):
+        builder = ShapeBuilder(Vector(0, 0), capacity=2)
+        builder.line_right(10).line_up(10).line_to(Vector(10, 10)).line_left(10)
+        builder.line_to_many([(0, 5), (0, 5), (0, 0)]).close()
+        shape = builder.build(label="square")
+        self.assertEqual(
+            shape.coordinates.tolist(),
+            [[0, 0], [10, 0], [10, 10], [0, 10], [0, 5], [0, 0]],
+        )
+        self.assertEqual((shape.style, shape.label), ("polygon", "square"))
+        # Drawing on after building leaves the built shape alone
+        builder.line_right(5)
+        builder.start_at(Vector(1, 1))
+        self.assertEqual(shape.number_of_points, 6)
+        self.assertEqual(shape.last_point, Vector(0, 0))
+        self.assertEqual(builder.build().coordinates.tolist(), [[1, 1]])
+        with self.assertRaises(Exception):
+            ShapeBuilder().line(1, 1)
+        with self.assertRaises(Exception):
+            ShapeBuilder(Vector(0, 0)).continue_with_arc(10, math.pi)
+        curved = (
+            ShapeBuilder(Vector(0, 0)).line_right(10).continue_with_arc(10, math.pi)
+        )
+        np.testing.assert_allclose(
+            curved.build().coordinates,
+            Shape([(0, 0), (10, 0)]).continue_with_arc(10, math.pi).coordinates,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
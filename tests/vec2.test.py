@@ -17,6 +17,21 @@ class TestVec2Methods(unittest.TestCase):
         self.assertEqual(normal.length, v.length)
         self.assertEqual(normal.x, -1)
 
+    def test_in_place_arithmetic(self):
+        v = Vector(1, 2, label="a")
+        same = v
+        v += Vector(1, 1)
+        v *= 2
+        self.assertIs(v, same)
+        self.assertEqual((v.x, v.y, v.label), (4, 6, "a"))
+
+    def test_squaring(self):
+        v = Vector(1, 2)
+        self.assertEqual(v.squareUp(3), Vector(1, 5))
+        self.assertEqual(v.squareUp(Vector(7, 8)), Vector(1, 8))
+        self.assertEqual(v.squareLeft(1.5), Vector(-0.5, 2))
+        self.assertEqual(v.squareRight(Vector(7, 8)), Vector(7, 2))
+
 
 if __name__ == "__main__":
     unittest.main()